@@ -0,0 +1,46 @@
+from mesa.time import RandomActivation
+
+
+class ActiveScheduler(RandomActivation):
+    """RandomActivation que só ativa os agentes acordados.
+
+    Um agente esperando por uma coleta conjunta fica dormente: sai do conjunto ativo quando seu
+    `waiting` passa a True e volta quando passa a False, em vez de ser chamado a cada passo só para
+    retornar. A ordem aleatória é sorteada entre os ativos a partir dos ids em ordem crescente, então
+    o sorteio não depende da ordem em que os agentes acordaram.
+    """
+
+    def __init__(self, model):
+        super().__init__(model)
+        self.active = set()
+
+    def add(self, agent):
+        super().add(agent)
+        if not getattr(agent, "waiting", False):
+            self.active.add(agent.unique_id)
+
+    def remove(self, agent):
+        super().remove(agent)
+        self.active.discard(agent.unique_id)
+
+    def set_dormant(self, agent, dormant):
+        """Tira o agente do conjunto ativo ou o devolve a ele. Agentes fora do schedule são ignorados."""
+        if dormant:
+            self.active.discard(agent.unique_id)
+        elif self._agents.get(agent.unique_id) is agent:
+            self.active.add(agent.unique_id)
+
+    def get_dormant_count(self):
+        return len(self._agents) - len(self.active)
+
+    def step(self):
+        agent_keys = sorted(self.active)
+        self.model.random.shuffle(agent_keys)
+        agents = self._agents
+        active = self.active
+        for agent_key in agent_keys:
+            # Um agente que adormeceu durante este passo, antes da sua vez, não é ativado
+            if agent_key in active:
+                agents[agent_key].step()
+        self.steps += 1
+        self.time += 1
@@ -1,39 +1,64 @@
-def agent_portrayal(agent):
-    color = agent.color
-    shape = agent.shape
-    layer = agent.layer
-
-    portrayal = {
-        "Shape": shape,
-        "Color": color,
-        "Filled": True,
-        "Layer": layer,
-        "Text_Color": "black",
-        "Font_Size": 8
-    }
-
-    if shape == "circle":
-        portrayal["r"] = 0.5
-    elif shape == "rect":
-        portrayal["w"] = 0.5
-        portrayal["h"] = 0.5
+SIZES = {"circle": ("r",), "rect": ("w", "h")}
+ENGINE_COLORS = {"SimpleAgent": "blue", "StateAgent": "green"}
+
+# Os portrayals não mudam enquanto o objeto não muda de estado de carga, então são montados uma vez e
+# reaproveitados. Quem os recebe não deve modificá-los. A chave é a classe, o texto e o estado de carga,
+# não o unique_id: recursos gerados continuamente ganham ids novos, mas reaproveitam o portrayal da classe.
+_pieces = {}
+_portrayals = {}
+
+
+def class_piece(cls, shape, color, layer, carrying):
+    """Parte do portrayal comum a todos os objetos de uma classe em um estado de carga."""
+    key = (cls, carrying)
+    piece = _pieces.get(key)
+    if piece is None:
+        piece = {
+            "Shape": shape,
+            "Color": color,
+            "Filled": True,
+            "Layer": layer,
+            "Text_Color": "black",
+            "Font_Size": 8
+        }
+        for size in SIZES.get(shape, ()):
+            piece[size] = 0.8 if carrying else 0.5
+        _pieces[key] = piece
+    return piece
 
+
+def agent_portrayal(agent):
+    carrying = bool(getattr(agent, 'carrying', None))
     if hasattr(agent, 'name'):
-        portrayal["Text"] = agent.name
+        text = agent.name
     elif hasattr(agent, 'type'):
-        portrayal["Text"] = agent.type
+        text = agent.type
     else:
-        portrayal["Text"] = ""
+        text = ""
+    key = (type(agent), text, carrying)
+    portrayal = _portrayals.get(key)
+    if portrayal is not None:
+        return portrayal
+
+    if carrying:
+        text += " (C)"
+    portrayal = dict(class_piece(type(agent), agent.shape, agent.color, agent.layer, carrying), Text=text)
+    _portrayals[key] = portrayal
+    return portrayal
 
-    if hasattr(agent, 'carrying') and agent.carrying:
-        if shape == "circle":
-            portrayal["r"] = 0.8
-        elif shape == "rect":
-            portrayal["w"] = 0.8
-            portrayal["h"] = 0.8
 
-        portrayal["Filled"] = True
+def engine_portrayal(engine, index):
+    """Portrayal de um agente do motor vetorizado, que não é um objeto do grid."""
+    carrying = bool(engine.carrying_mask[index])
+    key = ("engine", engine.names[index], carrying)
+    portrayal = _portrayals.get(key)
+    if portrayal is None:
+        name = engine.class_name(index)
+        text = engine.names[index] + (" (C)" if carrying else "")
+        portrayal = dict(class_piece(name, "circle", ENGINE_COLORS[name], 1, carrying), Text=text)
+        _portrayals[key] = portrayal
+    return portrayal
 
-        portrayal["Text"] += " (C)"
 
-    return portrayal
\ No newline at end of file
+def clear_portrayal_cache():
+    _portrayals.clear()
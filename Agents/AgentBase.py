@@ -1,19 +1,41 @@
 from mesa import Agent
 from Resources import *
+from EventLog import PICKUP, WAIT, DELIVER
+from VisitedMap import VisitedMap
 
 class AgentBase(Agent):
+    type = "Agent"
+    shape = "circle"
+    layer = 1
+    color = None
+    cooperative = True #Pode ser recrutado para coletas que exigem dois agentes
+
     def __init__(self, unique_id, model, name="Agent"):
         super().__init__(unique_id, model)
         self.name = name
         self.carrying = None
         self.points = 0
-        self.type = "Agent"
-        self.shape = "circle"
-        self.layer = 1
-        self.waiting = False
+        self._waiting = False
         self.known_resources = []
+        self.known_resources_set = set()
         self.partner = None
-        self.visited_positions = set()
+        self.rendezvous = None #Coleta conjunta para a qual o agente foi recrutado
+        self.visited_positions = VisitedMap(model.grid.width, model.grid.height)
+
+    @property
+    def waiting(self):
+        """Se o agente está parado esperando um parceiro. Enquanto espera, o schedule não o ativa."""
+        return self._waiting
+
+    @waiting.setter
+    def waiting(self, value):
+        if value != self._waiting:
+            self._waiting = value
+            self.model.schedule.set_dormant(self, value)
+
+    @property
+    def class_name(self):
+        return type(self).__name__
 
     def step(self):
         pass
@@ -48,6 +70,13 @@ class AgentBase(Agent):
             new_position = (new_x, new_y)
             self.model.grid.move_agent(self, new_position)
 
+    def return_to_base(self):
+        """Anda até a base mais próxima e entrega o recurso carregado ao chegar."""
+        base = self.model.nearest_base(self.pos)
+        self.move_towards(base.pos)
+        if self.pos == base.pos:
+            self.deliver_resource()
+
     def random_move_to_unvisited_position(self):
         """Move-se para uma célula aleatória não visitada. Se não houver, move-se para qualquer célula adjacente válida."""
         possible_steps = self.model.grid.get_neighborhood(
@@ -78,73 +107,131 @@ class AgentBase(Agent):
                 new_position = self.random.choice(valid_steps)
                 self.model.grid.move_agent(self, new_position)
 
+    def explore(self):
+        """Explora o grid: com o mapa de cobertura do modelo, anda até a célula de fronteira mais próxima
+        reservada para este agente; sem ele, anda para uma vizinha que o próprio agente não visitou."""
+        coverage = self.model.coverage
+        if coverage is None:
+            self.random_move_to_unvisited_position()
+            return
+        step = self.model.schedule.steps
+        target = coverage.target(self)
+        if target is None or coverage.seen[target]:
+            target = coverage.nearest(self.pos, self, step)
+        if target is None:
+            coverage.release(self)
+            self.random_move_to_unvisited_position()
+        else:
+            coverage.claim(self, target, step)
+            self.move_towards(target)
+            self.visited_positions.add(self.pos)
+        coverage.mark(self.pos)
+
     def check_resources(self):
         """Verifica se há recursos na vizinhança e informa ao agente BDI"""
-        neighbors = self.model.grid.get_neighborhood(
-            self.pos,
-            moore=True,
-            include_center=False
-        )
-
-        neighbors_contents = self.model.grid.get_cell_list_contents(neighbors)
-        for obj in neighbors_contents:
-            if isinstance(obj, ResourceBase) and not obj.carried:
-                self.inform_resource_to_bdi(obj)
-                if obj not in self.known_resources:
-                    self.known_resources.append(obj)
+        for obj in self.model.resource_index.neighborhood(self.pos):
+            self.inform_resource_to_bdi(obj)
+            if obj not in self.known_resources_set:
+                self.known_resources_set.add(obj)
+                self.known_resources.append(obj)
 
     def inform_resource_to_bdi(self, resource):
         """Informa ao agente BDI a localização de um recurso que foi visto"""
-        for agent in self.model.bdi_agents:
-            if resource not in agent.beliefs:
-                agent.beliefs.append(resource)
+        if self.model.bdi_agents:
+            self.model.blackboard.add(resource)
+
+    def follow_rendezvous(self):
+        """Se o agente foi recrutado para uma coleta conjunta, anda até o recurso e o coleta com o parceiro."""
+        request = self.rendezvous
+        if request is None:
+            return False
+        self.move_towards(request.resource.pos)
+        if self.pos == request.resource.pos:
+            self.collect_any_resource()
+        return True
 
     def collect_any_resource(self):
         """Coleta qualquer tipo de recurso na célula atual se todos os agentes necessários estiverem presentes."""
-        cell_contents = self.model.grid.get_cell_list_contents([self.pos])
-        resources = [obj for obj in cell_contents if isinstance(obj, ResourceBase) and not obj.carried]
+        resources = self.model.resource_index.at(self.pos)
         if len(resources) == 0:
             return
-        agents = [obj for obj in cell_contents if isinstance(obj, AgentBase) and not obj.carrying]
+        if self.rendezvous is not None and self.rendezvous.resource in resources:
+            resources = [self.rendezvous.resource]
+        cell_contents = self.model.grid.get_cell_list_contents([self.pos])
+        agents = [obj for obj in cell_contents if isinstance(obj, AgentBase) and obj.cooperative and not obj.carrying]
+        if self.model.engine is not None:
+            agents.extend(self.model.engine.agents_at(self.pos))
 
         for resource in resources:
             if len(agents) >= resource.required_agents:
-                self.carrying = resource
-                resource.carried = True
-                self.model.grid.remove_agent(resource)
                 if resource.required_agents == 2:
-                    self.waiting = False
-                    print(f"{self.name} e {agents[0].name} coletaram {resource.name}.")
-                    agents[0].carrying = resource
-                    agents[0].partner = self
-                    agents[0].waiting = False
-                    self.partner = agents[0]
-                else:
-                    print(f"{self.name} coletou {resource.name}.")
+                    self.collect_jointly(resource, agents)
+                    break
+                self.carrying = resource
+                self.model.pick_up_resource(resource)
+                if self.model.events is not None:
+                    self.model.events.record(self.model.schedule.steps, PICKUP, self.unique_id, agent=self.name,
+                                             resource=resource.name)
                 break
             else:
-                self.waiting = True
-                print(f"{self.name} está esperando por mais um agente para coletar {resource.name} em {resource.pos}.")
+                if self.model.events is not None:
+                    self.model.events.record(self.model.schedule.steps, WAIT, self.unique_id, agent=self.name,
+                                             resource=resource.name, pos=resource.pos)
+                self.model.rendezvous.open(resource, self)
+                break
+
+    def collect_jointly(self, resource, agents):
+        """Coleta um recurso de dois agentes com o parceiro presente na célula, de preferência quem o esperava."""
+        request = self.model.rendezvous.pending.get(resource.unique_id)
+        if request is not None and request.waiter is not self and request.waiter in agents:
+            partner = request.waiter
+        else:
+            partner = next(agent for agent in agents if agent is not self)
+        self.model.pick_up_resource(resource)
+        if self.model.events is not None:
+            self.model.events.record(self.model.schedule.steps, PICKUP, self.unique_id, agent=self.name,
+                                     resource=resource.name, partner=partner.name)
+        for agent, other in ((self, partner), (partner, self)):
+            agent.carrying = resource
+            agent.partner = other
+            agent.waiting = False
 
     def collect_simple_resource(self):
         """Coleta um recurso simples na célula atual."""
-        cell_contents = self.model.grid.get_cell_list_contents([self.pos])
-        resources = [obj for obj in cell_contents if isinstance(obj, EnergeticCrystal) and not obj.carried]
+        resources = [obj for obj in self.model.resource_index.at(self.pos) if isinstance(obj, EnergeticCrystal)]
         for resource in resources:
-            resource.carried = True
             self.carrying = resource
-            print(f"{self.name} coletou {resource.name}.")
-            self.model.grid.remove_agent(resource)
+            if self.model.events is not None:
+                self.model.events.record(self.model.schedule.steps, PICKUP, self.unique_id, agent=self.name,
+                                         resource=resource.name)
+            self.model.pick_up_resource(resource)
             break
 
     def deliver_resource(self):
-        """Entrega o recurso na base"""
-        self.points += self.carrying.value
-        print(f"{self.name} entregou {self.carrying.name} na base e ganhou {self.carrying.value} pontos.")
-        if self.carrying in self.known_resources:
-            self.known_resources.remove(self.carrying)
-        if self.carrying.required_agents == 2:
-            self.model.num_resources_delivered += 0.5
-        else:
-            self.model.num_resources_delivered += 1
-        self.carrying = None
\ No newline at end of file
+        """Entrega o recurso na base. Um recurso coletado em dupla é entregue uma única vez, pelos dois agentes,
+        e o valor é dividido entre eles."""
+        resource = self.carrying
+        partner = self.partner
+        value = resource.value
+        if partner is not None:
+            share = resource.value // resource.required_agents
+            value -= share
+            partner.points += share
+            partner.forget_resource(resource)
+            partner.carrying = None
+            partner.partner = None
+            self.partner = None
+        self.points += value
+        if self.model.events is not None:
+            self.model.events.record(self.model.schedule.steps, DELIVER, self.unique_id, agent=self.name,
+                                     resource=resource.name, value=value,
+                                     partner=partner.name if partner is not None else None)
+        self.forget_resource(resource)
+        self.model.record_delivery(type(self).__name__, resource,
+                                   partner.class_name if partner is not None else None, pos=self.pos)
+        self.carrying = None
+
+    def forget_resource(self, resource):
+        if resource in self.known_resources_set:
+            self.known_resources_set.discard(resource)
+            self.known_resources.remove(resource)
\ No newline at end of file
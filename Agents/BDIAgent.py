@@ -1,59 +1,88 @@
+import heapq
+
 from Agents import AgentBase
 
 class BDIAgent(AgentBase):
+    color = "purple"
+
     def __init__(self, unique_id, model, name="BDIAgent"):
         super().__init__(unique_id, model)
         self.name = name
-        self.beliefs = []  #Lista com os recursos informados por outros agentes
-        self.desires = [] #Lista com os recursos que deseja coletar
-        self.color = "purple"
+        self.desires = [] #Heap de (prioridade, unique_id, recurso) dos recursos que deseja coletar
+        self.cursor = 0 #Posição no registro do quadro de crenças até onde o agente já leu
+        self.intention = None #Recurso que o agente se comprometeu a coletar
+        self.intention_id = None #unique_id do recurso da intenção quando ela foi escolhida
+        self.keyed_at = None #Posição de onde todas as prioridades do heap foram calculadas, se houver uma só
 
-    def step(self):
-        for resource in self.beliefs:
-            if resource.pos is None:
-                self.beliefs.remove(resource)
+    @property
+    def beliefs(self):
+        """Recursos informados por outros agentes, compartilhados no quadro de crenças do modelo."""
+        return self.model.blackboard
 
+    def step(self):
         if self.waiting:
             return
-
-        self.update_desires()
-        self.execute_intention()
+        if self.follow_rendezvous():
+            self.visited_positions.add(self.pos)
+            return
 
         self.visited_positions.add(self.pos)
 
         if self.carrying:
-            self.move_towards(self.model.base.pos)
-            if self.pos == self.model.base.pos:
-                self.deliver_resource()
+            self.return_to_base()
             return
-        if self.desires and not self.carrying:
-            # print(f"{self.name} conhece {len(self.desires)} recursos.")
-            # print(f"{self.name} está se movendo em direção ao recurso {self.desires[0].name}.")
-            # print(f"{self.name} está na posição {self.pos}.")
-            self.move_towards(self.desires[0].pos)
-            if self.pos == self.desires[0].pos:
-                self.collect_any_resource()
+        intention = self.deliberate()
+        if intention is not None:
+            self.execute_intention(intention)
             return
 
-        self.random_move_to_unvisited_position()
+        self.explore()
         self.collect_any_resource()
         self.check_resources()
 
-    def update_desires(self):
-        """Atualiza a lista de desejos com os recursos que deseja coletar."""
-        for resource in self.beliefs:
-            if resource is not None and resource.carried == False and resource.required_agents == 2:
-                if resource not in self.desires:
-                    self.desires.append(resource)
-
-    def execute_intention(self):
-        """Executa a intenção de coletar um recurso."""
-        if self.desires:
-            for resource in self.desires:
-                self.move_towards(resource.pos) # Erro aqui NoneType
-                if resource.pos == self.pos:
-                    self.waiting = True
-                    self.collect_any_resource()
-                    self.desires.remove(resource)
-                    self.waiting = False
-                    return
\ No newline at end of file
+    def priority(self, resource):
+        """Passos até o recurso por ponto que ele rende a cada agente; quanto menor, melhor."""
+        x, y = self.pos
+        rx, ry = resource.pos
+        return (max(abs(rx - x), abs(ry - y)) + 1) * resource.required_agents / resource.value
+
+    def is_desired(self, entry):
+        """Se a entrada do heap ainda vale: o recurso continua no quadro de crenças e não foi reaproveitado
+        com outro unique_id pela geração contínua."""
+        _, unique_id, resource = entry
+        return self.model.blackboard.current(unique_id, resource)
+
+    def deliberate(self):
+        """Mantém a intenção enquanto o recurso estiver no quadro de crenças, sem nenhum outro trabalho. Sem
+        intenção, lê do quadro só os recursos registrados depois do cursor e escolhe o desejo de maior
+        prioridade, recalculando as prioridades só se o agente andou desde que elas foram calculadas."""
+        blackboard = self.model.blackboard
+        if self.intention is not None:
+            if blackboard.current(self.intention_id, self.intention):
+                return self.intention
+            self.intention = self.intention_id = None
+        if self.keyed_at != self.pos:
+            # Mesma conta de priority(), feita em linha porque o heap inteiro é recalculado a cada passo dado
+            x, y = self.pos
+            resources = blackboard.resources
+            self.desires = [((max(abs(resource.pos[0] - x), abs(resource.pos[1] - y)) + 1)
+                             * resource.required_agents / resource.value, unique_id, resource)
+                            for _, unique_id, resource in self.desires if resources.get(unique_id) is resource]
+            heapq.heapify(self.desires)
+            self.keyed_at = self.pos
+        for unique_id, resource in blackboard.since(self.cursor):
+            if resource.required_agents == 2 and blackboard.current(unique_id, resource):
+                heapq.heappush(self.desires, (self.priority(resource), unique_id, resource))
+        self.cursor = blackboard.end
+        while self.desires:
+            entry = heapq.heappop(self.desires)
+            if self.is_desired(entry):
+                self.intention_id, self.intention = entry[1], entry[2]
+                return entry[2]
+        return None
+
+    def execute_intention(self, resource):
+        """Dá um passo em direção ao recurso da intenção e tenta coletá-lo ao chegar."""
+        self.move_towards(resource.pos)
+        if self.pos == resource.pos:
+            self.collect_any_resource()
\ No newline at end of file
@@ -1,10 +1,13 @@
 from Agents import *
 
 class ObjectiveAgent(AgentBase):
+    color = "yellow"
+
     def __init__(self, unique_id, model, name="ObjectiveAgent"):
         super().__init__(unique_id, model)
-        self.color = "yellow"
         self.name = name
+        self.target = None
+        model.planner.register(self)
 
     def step(self):
         """Executa as ações do agente em cada passo da simulação."""
@@ -14,16 +17,24 @@ class ObjectiveAgent(AgentBase):
         self.visited_positions.add(self.pos)
 
         if self.carrying:
-            self.move_towards(self.model.base.pos)
-            if self.pos == self.model.base.pos:
-                self.deliver_resource()
+            self.return_to_base()
+            return
+        if self.follow_rendezvous():
             return
-        if self.known_resources and not self.carrying:
-            self.move_towards(self.known_resources[0].pos)
-            if self.pos == self.known_resources[0].pos:
+        if self.target is not None and self.target.carried:
+            self.model.planner.plan([self])
+        if self.target is not None:
+            self.move_towards(self.target.pos)
+            if self.pos == self.target.pos:
                 self.collect_any_resource()
+                if self.carrying:
+                    self.model.planner.release(self)
             return
 
-        self.random_move_to_unvisited_position()
+        self.explore()
         self.collect_any_resource()
-        self.check_resources()
\ No newline at end of file
+        self.check_resources()
+
+    def score(self, resource, distance, return_distance):
+        """Prioriza o recurso conhecido mais próximo."""
+        return -distance
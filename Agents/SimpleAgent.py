@@ -1,17 +1,18 @@
 from Agents.AgentBase import AgentBase
+from EventLog import DELIVER
 
 class SimpleAgent(AgentBase):
+    color = "blue"
+    cooperative = False #Só coleta cristais, então não participa de coletas conjuntas
+
     def __init__(self, unique_id, model, name="SimpleAgent"):
         super().__init__(unique_id, model)
         self.name = name
-        self.color = "blue"
 
     def step(self):
         """Executa as ações do agente em cada passo da simulação."""
         if self.carrying is not None:
-            self.move_towards(self.model.base.position)
-            if self.pos == self.model.base.position:
-                self.deliver_resource()
+            self.return_to_base()
         else:
             self.random_move()
             self.collect_simple_resource()
@@ -42,6 +43,8 @@ class SimpleAgent(AgentBase):
     def deliver_resource(self):
         """Entrega o recurso na base."""
         self.points += self.carrying.value
-        print(f"{self.name} entregou {self.carrying.name} na base e ganhou {self.carrying.value} pontos.")
-        self.carrying = None
-        self.model.num_resources_delivered += 1
\ No newline at end of file
+        if self.model.events is not None:
+            self.model.events.record(self.model.schedule.steps, DELIVER, self.unique_id, agent=self.name,
+                                     resource=self.carrying.name, value=self.carrying.value)
+        self.model.record_delivery(type(self).__name__, self.carrying, pos=self.pos)
+        self.carrying = None
\ No newline at end of file
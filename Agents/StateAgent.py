@@ -1,9 +1,10 @@
 from Agents import *
 
 class StateAgent(AgentBase):
+    color = "green"
+
     def __init__(self, unique_id, model, name="StateAgent"):
         super().__init__(unique_id, model)
-        self.color = "green"
         self.name = name
 
     def step(self):
@@ -14,11 +15,11 @@ class StateAgent(AgentBase):
         self.visited_positions.add(self.pos)
 
         if self.carrying:
-            self.move_towards(self.model.base.pos)
-            if self.pos == self.model.base.pos:
-                self.deliver_resource()
+            self.return_to_base()
+            return
+        if self.follow_rendezvous():
             return
 
-        self.random_move_to_unvisited_position()
+        self.explore()
         self.collect_any_resource()
         self.check_resources()
\ No newline at end of file
@@ -0,0 +1,147 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from ModelBase import ModelBase, AGENT_CLASSES
+
+DEFAULT_SWEEP = {
+    "num_agents": [{
+        "SimpleAgent": 0,
+        "StateAgent": 2,
+        "ObjectiveAgent": 0,
+        "UtilityAgent": 0,
+        "BDIAgent": 1
+    }],
+    "num_resources": [{
+        "EnergeticCrystal": 5,
+        "RareMetalBlock": 5,
+        "AncientStructure": 5
+    }],
+    "grid_params": [{
+        "width": 15,
+        "height": 15
+    }],
+    "seeds": [0]
+}
+
+FIELDS = ["config_id", "seed", "num_agents", "num_resources", "grid_params",
+          "steps", "completed", "TotalPoints"] + [f"points_{name}" for name in AGENT_CLASSES] + \
+         ["visited_bytes_per_agent", "error"]
+
+
+def run_model(num_agents, num_resources, grid_params, seed=None, max_steps=10000, engine=None, collector=None,
+              collect_every=1):
+    """Executa um ModelBase até o fim (running == False) ou até max_steps e retorna uma linha de resultados.
+    Com collector (um caminho .csv ou .jsonl), as linhas por passo de modelo e de agentes são gravadas em disco."""
+    row = {
+        "seed": seed,
+        "num_agents": json.dumps(num_agents, sort_keys=True),
+        "num_resources": json.dumps(num_resources, sort_keys=True),
+        "grid_params": json.dumps(grid_params, sort_keys=True),
+        "error": ""
+    }
+    model = None
+    try:
+        model = ModelBase(num_agents, num_resources, grid_params, seed=seed, engine=engine, collector=collector,
+                          collect_every=collect_every)
+        while model.running and model.schedule.steps < max_steps:
+            model.step()
+    except Exception as error:
+        row["error"] = f"{type(error).__name__}: {error}"
+    finally:
+        if model is not None:
+            model.close()
+
+    built = model is not None
+    points_by_class = model.points_by_class if built else dict.fromkeys(AGENT_CLASSES, 0)
+
+    row["steps"] = model.schedule.steps if built else 0
+    row["completed"] = built and not model.running and not row["error"]
+    row["TotalPoints"] = model.total_points if built else 0
+    row["visited_bytes_per_agent"] = model.visited_bytes_per_agent() if built else 0
+    for name in AGENT_CLASSES:
+        row[f"points_{name}"] = points_by_class[name]
+    return row
+
+
+def _run_job(job):
+    config_id, num_agents, num_resources, grid_params, seed, max_steps, engine = job[:7]
+    stream_dir, stream_format, collect_every = job[7:]
+    collector = None
+    if stream_dir is not None:
+        collector = os.path.join(stream_dir, f"run_{config_id}_{seed}.{stream_format}")
+    row = run_model(num_agents, num_resources, grid_params, seed=seed, max_steps=max_steps, engine=engine,
+                    collector=collector, collect_every=collect_every)
+    row["config_id"] = config_id
+    return row
+
+
+def build_jobs(sweep, max_steps=10000, engine=None, stream_dir=None, stream_format="csv", collect_every=1):
+    """Gera o produto cartesiano das configurações da varredura com as sementes."""
+    configs = itertools.product(sweep["num_agents"], sweep["num_resources"], sweep["grid_params"])
+    jobs = []
+    for config_id, (num_agents, num_resources, grid_params) in enumerate(configs):
+        for seed in sweep.get("seeds", [None]):
+            jobs.append((config_id, num_agents, num_resources, grid_params, seed, max_steps, engine,
+                         stream_dir, stream_format, collect_every))
+    return jobs
+
+
+def batch_run(sweep, output_path, workers=None, max_steps=10000, engine=None, stream_dir=None, stream_format="csv",
+              collect_every=1):
+    """Executa a varredura em um pool de processos e escreve uma linha por execução no CSV de saída.
+    Com stream_dir, cada execução grava também suas linhas por passo em stream_dir/run_<config>_<semente>_*."""
+    if stream_dir is not None:
+        os.makedirs(stream_dir, exist_ok=True)
+    jobs = build_jobs(sweep, max_steps, engine, stream_dir, stream_format, collect_every)
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (workers * 4))
+
+    with open(output_path, "w", newline="") as output_file, ProcessPoolExecutor(max_workers=workers) as executor:
+        writer = csv.DictWriter(output_file, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in executor.map(_run_job, jobs, chunksize=chunksize):
+            writer.writerow(row)
+            output_file.flush()
+    return len(jobs)
+
+
+def load_sweep(path):
+    """Carrega a varredura de um arquivo JSON. Chaves ausentes usam os valores padrão do Server.py."""
+    sweep = dict(DEFAULT_SWEEP)
+    if path:
+        with open(path) as sweep_file:
+            sweep.update(json.load(sweep_file))
+    return sweep
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Executa o ModelBase sem interface gráfica em uma varredura de parâmetros.")
+    parser.add_argument("--sweep", help="Arquivo JSON com listas 'num_agents', 'num_resources', 'grid_params' e 'seeds'.")
+    parser.add_argument("--seeds", type=int, help="Número de sementes por configuração (substitui 'seeds' do arquivo).")
+    parser.add_argument("--workers", type=int, default=None, help="Número de processos (padrão: número de CPUs).")
+    parser.add_argument("--max-steps", type=int, default=10000, help="Limite de passos por execução.")
+    parser.add_argument("--output", default="batch_results.csv", help="Arquivo CSV de saída.")
+    parser.add_argument("--engine", choices=["vector"], default=None,
+                        help="Motor de simulação: 'vector' avança SimpleAgent e StateAgent em lote com NumPy.")
+    parser.add_argument("--stream-dir", default=None,
+                        help="Diretório onde cada execução grava suas linhas por passo de modelo e de agentes.")
+    parser.add_argument("--stream-format", choices=["csv", "jsonl"], default="csv",
+                        help="Formato das linhas por passo.")
+    parser.add_argument("--collect-every", type=int, default=1, help="Coleta os reporters a cada N passos.")
+    args = parser.parse_args(argv)
+
+    sweep = load_sweep(args.sweep)
+    if args.seeds is not None:
+        sweep["seeds"] = list(range(args.seeds))
+
+    total = batch_run(sweep, args.output, workers=args.workers, max_steps=args.max_steps, engine=args.engine,
+                      stream_dir=args.stream_dir, stream_format=args.stream_format, collect_every=args.collect_every)
+    print(f"{total} execuções gravadas em {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
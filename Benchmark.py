@@ -0,0 +1,226 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from ModelBase import ModelBase, AGENT_CLASSES, AGENT_TYPES, RESOURCE_CLASSES, RESOURCE_TYPES, EXPLORATION_MODES
+
+HOT_METHODS = ["move_towards", "explore", "random_move_to_unvisited_position", "check_resources", "collect_any_resource"]
+
+MIXES = {
+    "simple": {"SimpleAgent": 1.0},
+    "state": {"StateAgent": 1.0},
+    "bdi_heavy": {"BDIAgent": 0.7, "StateAgent": 0.3},
+    "mixed": dict.fromkeys(AGENT_CLASSES, 0.2)
+}
+
+DEFAULT_SIZES = [15, 50, 100, 250, 500, 1000]
+
+
+def agent_counts(mix, total):
+    """Divide o total de agentes entre as classes conforme as proporções da mistura. Toda classe da mistura
+    recebe ao menos um agente, mesmo que o total passe do pedido em grids pequenos."""
+    counts = dict.fromkeys(AGENT_CLASSES, 0)
+    for name, share in mix.items():
+        counts[name] = max(1, int(total * share))
+    largest = max(mix, key=mix.get)
+    counts[largest] = max(1, counts[largest] + total - sum(counts.values()))
+    return counts
+
+
+def resource_counts(size, scale, mix):
+    """Recursos proporcionais à área do grid; 15x15 usa os 5/5/5 do Server.py. Uma mistura só de SimpleAgent
+    recebe só cristais, os únicos recursos que ele coleta, para que a execução possa terminar."""
+    per_type = max(5, round(5 * size * size / 225 / 20 * scale))
+    if set(mix) <= {"SimpleAgent"}:
+        return {"EnergeticCrystal": per_type, "RareMetalBlock": 0, "AncientStructure": 0}
+    return dict.fromkeys(RESOURCE_CLASSES, per_type)
+
+
+def build_cases(sizes, mixes, scales, agents_per_side):
+    cases = []
+    for size in sizes:
+        total_agents = max(3, size // agents_per_side)
+        for mix_name in mixes:
+            for scale in scales:
+                cases.append({
+                    "size": size,
+                    "mix": mix_name,
+                    "resource_scale": scale,
+                    "num_agents": agent_counts(MIXES[mix_name], total_agents),
+                    "num_resources": resource_counts(size, scale, MIXES[mix_name])
+                })
+    return cases
+
+
+def build_model(case, seed, engine, profile=False, exploration="random", spawn_rate=None):
+    grid_params = {"width": case["size"], "height": case["size"]}
+    spawn_rates = dict.fromkeys(RESOURCE_CLASSES, spawn_rate) if spawn_rate is not None else None
+    return ModelBase(case["num_agents"], case["num_resources"], grid_params, seed=seed, engine=engine,
+                     profile=profile, exploration=exploration, spawn_rates=spawn_rates)
+
+
+def run_case(case, seed=0, max_steps=20000, time_limit=60.0, profile_steps=100, engine=None, exploration="random",
+             spawn_rate=None):
+    """Mede um caso da matriz: passos/s até o fim ou até os limites, memória de pico e tempo por método.
+    Com spawn_rate a execução não termina sozinha e mede também as entregas e pontos por passo em regime."""
+    start = time.perf_counter()
+    model = build_model(case, seed, engine, exploration=exploration, spawn_rate=spawn_rate)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    while model.running and model.schedule.steps < max_steps and time.perf_counter() - start < time_limit:
+        model.step()
+    run_seconds = time.perf_counter() - start
+    steps = model.schedule.steps
+
+    # Segunda passada, curta e instrumentada: tempo por método quente e memória Python de pico
+    tracemalloc.start()
+    try:
+        profiled = build_model(case, seed, engine, profile=True, exploration=exploration, spawn_rate=spawn_rate)
+        for _ in range(profile_steps):
+            if not profiled.running:
+                break
+            profiled.step()
+        _, peak_traced = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    totals = profiled.profiler.method_totals()
+    timings = {name: totals.get(name, [0, 0.0]) for name in HOT_METHODS}
+
+    return {
+        **case,
+        "seed": seed,
+        "engine": engine,
+        "exploration": exploration,
+        "spawn_rate": spawn_rate,
+        "build_seconds": build_seconds,
+        "steps": steps,
+        "completed": not model.running,
+        "run_seconds": run_seconds,
+        "steps_per_second": steps / run_seconds if run_seconds > 0 else None,
+        "time_to_completion": run_seconds if not model.running else None,
+        "total_points": model.total_points,
+        "deliveries_per_step": model.spawner.meter.deliveries_per_step() if model.spawner is not None else None,
+        "points_per_step": {name: model.spawner.meter.points_per_step(name) for name in AGENT_CLASSES}
+                           if model.spawner is not None else None,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource is not None else None,
+        "peak_traced_bytes": peak_traced,
+        "methods": {name: {"calls": calls, "seconds": seconds, "us_per_call": seconds / calls * 1e6 if calls else None}
+                    for name, (calls, seconds) in timings.items()}
+    }
+
+
+def bytes_per_object(factory, count=10000):
+    """Memória Python alocada por objeto criado por factory(i), medida com tracemalloc sobre count objetos."""
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        objects = [factory(index) for index in range(count)]
+        allocated = tracemalloc.get_traced_memory()[0] - start - sys.getsizeof(objects)
+    finally:
+        tracemalloc.stop()
+    return allocated / count
+
+
+def memory_report(count=10000):
+    """Bytes por instância de cada classe de recurso e de agente, sem contar o grid."""
+    grid_params = {"width": 100, "height": 100}
+    model = ModelBase(dict.fromkeys(AGENT_CLASSES, 0), dict.fromkeys(RESOURCE_CLASSES, 0), grid_params)
+    report = {}
+    for name, resource_class in RESOURCE_TYPES.items():
+        report[name] = bytes_per_object(lambda index: resource_class(index, model), count)
+    for name, agent_class in AGENT_TYPES.items():
+        report[name] = bytes_per_object(lambda index: agent_class(unique_id=index, model=model, name=f"{name}_{index}"),
+                                        count)
+    return report
+
+
+def _run_case_job(job):
+    return run_case(*job)
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Imprime a razão de passos/s de cada caso em relação a um arquivo de resultados anterior."""
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+    key = lambda result: (result["size"], result["mix"], result["resource_scale"], result["engine"],
+                          result.get("exploration", "random"), result.get("spawn_rate"))
+    previous = {key(result): result for result in baseline["results"]}
+    for result in results:
+        old = previous.get(key(result))
+        if old and old["steps_per_second"] and result["steps_per_second"]:
+            ratio = result["steps_per_second"] / old["steps_per_second"]
+            print(f"{result['mix']:>10} {result['size']:>5}x{result['size']:<5} escala {result['resource_scale']}: "
+                  f"{ratio:.2f}x passos/s em relação à referência")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede a vazão de passos do ModelBase para várias misturas de agentes e tamanhos de grid.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Lados dos grids quadrados.")
+    parser.add_argument("--mixes", nargs="+", choices=sorted(MIXES), default=sorted(MIXES), help="Misturas de agentes.")
+    parser.add_argument("--resource-scales", type=float, nargs="+", default=[1.0], help="Multiplicadores da quantidade de recursos.")
+    parser.add_argument("--agents-per-side", type=int, default=5, help="Um agente a cada N células do lado do grid.")
+    parser.add_argument("--max-steps", type=int, default=20000, help="Limite de passos por caso.")
+    parser.add_argument("--time-limit", type=float, default=60.0, help="Limite de tempo, em segundos, por caso.")
+    parser.add_argument("--profile-steps", type=int, default=100, help="Passos da passada instrumentada por método.")
+    parser.add_argument("--engine", choices=["vector"], default=None, help="Motor de simulação.")
+    parser.add_argument("--exploration", choices=EXPLORATION_MODES, default="random", help="Modo de exploração dos agentes.")
+    parser.add_argument("--spawn-rate", type=float, default=None,
+                        help="Gera recursos continuamente, com esta taxa por passo para cada tipo de recurso.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json", help="Arquivo JSON de saída.")
+    parser.add_argument("--baseline", help="Arquivo JSON de uma execução anterior para comparação.")
+    parser.add_argument("--memory", action="store_true", help="Só mede os bytes por instância de recursos e agentes.")
+    args = parser.parse_args(argv)
+
+    if args.memory:
+        for name, size in memory_report().items():
+            print(f"{name:>18} {size:8.1f} bytes por instância")
+        return
+
+    cases = build_cases(args.sizes, args.mixes, args.resource_scales, args.agents_per_side)
+    jobs = [(case, args.seed, args.max_steps, args.time_limit, args.profile_steps, args.engine, args.exploration,
+             args.spawn_rate) for case in cases]
+
+    # Um processo novo por caso, para que a memória de pico de um caso não contamine o seguinte
+    results = []
+    with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as executor:
+        for result in executor.map(_run_case_job, jobs):
+            print(f"{result['mix']:>10} {result['size']:>5}x{result['size']:<5} {result['steps']:>6} passos "
+                  f"{result['steps_per_second'] or 0:.1f} passos/s")
+            results.append(result)
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results
+    }
+    with open(args.output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"{len(results)} casos gravados em {args.output}.")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
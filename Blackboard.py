@@ -0,0 +1,57 @@
+class Blackboard:
+    """Armazena as crenças compartilhadas dos agentes BDI: recursos avistados e ainda não coletados.
+
+    Cada recurso novo também entra no fim de um registro só de acréscimos. Os agentes BDI guardam um cursor
+    nesse registro e leem apenas as entradas posteriores a ele, quando deliberam; recursos que saíram do
+    quadro depois de registrados são descartados na leitura com current().
+    """
+
+    def __init__(self, readers=None):
+        self.resources = {}
+        self.log = []
+        self.log_start = 0 #Posição absoluta da primeira entrada ainda guardada no registro
+        self.trim_at = 1024
+        self.readers = readers if readers is not None else []
+
+    def add(self, resource):
+        """Registra um recurso avistado. Custa O(1) amortizado e ignora recursos já conhecidos."""
+        if resource.unique_id not in self.resources:
+            self.resources[resource.unique_id] = resource
+            self.log.append((resource.unique_id, resource))
+            if len(self.log) >= self.trim_at:
+                self.trim()
+
+    def remove(self, resource):
+        """Remove um recurso coletado das crenças. Os leitores percebem a remoção ao consultar current()."""
+        self.resources.pop(resource.unique_id, None)
+
+    def current(self, unique_id, resource):
+        """Se o recurso ainda está no quadro com esse unique_id (não foi coletado nem reaproveitado)."""
+        return self.resources.get(unique_id) is resource
+
+    @property
+    def end(self):
+        """Cursor de quem já leu o registro inteiro."""
+        return self.log_start + len(self.log)
+
+    def since(self, cursor):
+        """Entradas (unique_id, recurso) registradas a partir do cursor."""
+        return self.log[max(cursor - self.log_start, 0):]
+
+    def trim(self):
+        """Descarta as entradas que todos os leitores já leram. Só roda quando o registro dobra de tamanho,
+        então o custo de percorrer os cursores fica diluído entre os acréscimos."""
+        cursor = min((reader.cursor for reader in self.readers), default=self.end)
+        if cursor > self.log_start:
+            del self.log[:cursor - self.log_start]
+            self.log_start = cursor
+        self.trim_at = max(1024, 2 * len(self.log))
+
+    def __contains__(self, resource):
+        return resource.unique_id in self.resources
+
+    def __iter__(self):
+        return iter(self.resources.values())
+
+    def __len__(self):
+        return len(self.resources)
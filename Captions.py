@@ -1,8 +1,8 @@
-from mesa.visualization.modules import TextElement
+import json
 
-class Captions(TextElement):
-    def render(self, model):
-        return """
+from mesa.visualization.ModularVisualization import VisualizationElement
+
+CAPTIONS_HTML = """
         <div style="position: absolute; top: 10px; left: 620px; width: 200px; background-color: white; border: 1px solid black; padding: 10px;">
             <h3>Captions</h3>
             <ul style="list-style: none; padding: 0;">
@@ -18,3 +18,21 @@ class Captions(TextElement):
             </ul>
         </div>
         """
+
+
+class Captions(VisualizationElement):
+    """Legenda estática: o HTML vai uma única vez, no código da página, e não a cada passo."""
+
+    def __init__(self):
+        super().__init__()
+        self.js_code = (
+            "elements.push(new (function () {"
+            " const captions = document.createElement('div');"
+            f" captions.innerHTML = {json.dumps(CAPTIONS_HTML)};"
+            " document.getElementById('elements').appendChild(captions);"
+            " this.render = function () {}; this.reset = function () {};"
+            " })());"
+        )
+
+    def render(self, model):
+        return None
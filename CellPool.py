@@ -0,0 +1,38 @@
+class CellPool:
+    """Sorteia células do grid sem reposição, em O(1) por sorteio.
+
+    Implementa um embaralhamento de Fisher-Yates preguiçoso: só as posições já trocadas ficam
+    guardadas, então a memória cresce com o número de sorteios e não com o tamanho do grid.
+    """
+
+    def __init__(self, width, height, rng):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.rng = rng
+        self.swaps = {}
+        self.drawn = 0
+
+    def remaining(self):
+        return self.size - self.drawn
+
+    def draw(self):
+        """Retorna uma célula ainda não sorteada, ou None se todas já foram sorteadas."""
+        if self.drawn >= self.size:
+            return None
+        i = self.drawn
+        j = self.rng.randrange(i, self.size)
+        index = self.swaps.get(j, j)
+        if j != i:
+            self.swaps[j] = self.swaps.pop(i, i)
+        else:
+            self.swaps.pop(i, None)
+        self.drawn += 1
+        return index // self.height, index % self.height
+
+    def draw_empty(self, grid):
+        """Retorna uma célula ainda não sorteada e vazia no grid, ou None se não houver."""
+        cell = self.draw()
+        while cell is not None and not grid.is_cell_empty(cell):
+            cell = self.draw()
+        return cell
@@ -0,0 +1,327 @@
+import argparse
+import heapq
+import os
+import pickle
+import zlib
+
+import numpy as np
+
+from ModelBase import ModelBase, AGENT_CLASSES, AGENT_TYPES, RESOURCE_CLASSES, RESOURCE_TYPES
+from VectorEngine import VectorEngine, VECTOR_AGENT_CLASSES
+from VisitedMap import VisitedMap, CHUNK_BYTES
+from Rendezvous import PendingPickup
+
+CHECKPOINT_VERSION = 10
+
+
+def object_key(obj):
+    """Identifica um objeto do grid: ids de agentes e do Base podem coincidir, então o tipo faz parte da chave."""
+    if obj.unique_id in obj.model.resources and obj.model.resources[obj.unique_id] is obj:
+        return "r", obj.unique_id
+    if obj in obj.model.bases:
+        return "b", obj.unique_id
+    return "a", obj.unique_id
+
+
+def resource_id(resource):
+    return resource.unique_id if resource is not None else None
+
+
+def agent_state(agent):
+    visited = agent.visited_positions
+    resources = agent.model.resources
+    state = {
+        "class": type(agent).__name__,
+        "unique_id": agent.unique_id,
+        "name": agent.name,
+        "pos": agent.pos,
+        "carrying": resource_id(agent.carrying),
+        "points": agent.points,
+        "waiting": agent.waiting,
+        "partner": agent.partner.unique_id if agent.partner is not None else None,
+        # Recursos entregues e devolvidos ao pool de geração contínua não estão mais no modelo
+        "known_resources": [resource.unique_id for resource in agent.known_resources
+                            if resources.get(resource.unique_id) is resource],
+        "visited": ({key: bytes(chunk) for key, chunk in visited.chunks.items()}, visited.count)
+    }
+    if hasattr(agent, "target"):
+        state["target"] = resource_id(agent.target)
+    if hasattr(agent, "desires"):
+        blackboard = agent.model.blackboard
+        state["desires"] = [(entry[0], entry[1]) for entry in agent.desires if agent.is_desired(entry)]
+        # Entradas ainda válidas após o cursor: são sempre o fim do quadro, que guarda a ordem de registro
+        state["unread"] = sum(1 for unique_id, resource in blackboard.since(agent.cursor)
+                              if blackboard.current(unique_id, resource))
+        intention = agent.intention
+        state["intention"] = intention.unique_id if intention is not None and \
+            blackboard.current(agent.intention_id, intention) else None
+        state["keyed_at"] = agent.keyed_at
+    return state
+
+
+def engine_state(engine):
+    keys, chunks = engine.visited.state()
+    return {
+        "kind": engine.kind,
+        "unique_ids": engine.unique_ids,
+        "pos": engine.pos,
+        "carrying": [resource_id(resource) for resource in engine.carrying],
+        "waiting": engine.waiting,
+        "partner": engine.partner,
+        "outside_partner": [agent.unique_id if agent is not None else None for agent in engine.outside_partner],
+        "goal": engine.goal,
+        "points": engine.points,
+        "visited": (keys, zlib.compress(chunks.tobytes(), 1)),
+        "moves": engine.moves,
+        "rng": engine.rng.bit_generator.state
+    }
+
+
+def coverage_state(coverage):
+    return {
+        "seen": zlib.compress(np.packbits(coverage.seen).tobytes(), 1),
+        "targets": [(agent.unique_id, cell, step) for agent, (cell, step) in coverage.targets.items()],
+        "claims": [(block, agent.unique_id, step) for block, (agent, step) in coverage.claims.items()]
+    }
+
+
+def spawner_state(spawner):
+    meter = spawner.meter
+    return {
+        "pool": {name: len(pool) for name, pool in spawner.pool.items()},
+        "live": spawner.live,
+        "meter": (list(meter.steps), meter.delivered, meter.points, meter.delivered_sum, meter.points_sum)
+    }
+
+
+def model_state(model):
+    """Estado completo do modelo em tipos simples (dicts, listas, bytes e arrays). Dos mapas de posições
+    visitadas dos agentes só vão os blocos alocados; os do motor vetorizado ainda são comprimidos com zlib."""
+    positions = {obj.pos for obj in model.schedule.agents if obj.pos is not None}
+    positions.update(resource.pos for resource in model.resources.values() if not resource.carried)
+    cells = {pos: [object_key(obj) for obj in model.grid.get_cell_list_contents([pos])] for pos in positions}
+
+    return {
+        "version": CHECKPOINT_VERSION,
+        "params": model.params(),
+        "random": model.random.getstate(),
+        "steps": model.schedule.steps,
+        "time": model.schedule.time,
+        "running": model.running,
+        "current_id": model.current_id,
+        "resource_id": model.resource_id,
+        "num_resources_total": model.num_resources_total,
+        "num_resources_delivered": model.num_resources_delivered,
+        "total_points": model.total_points,
+        "points_by_class": model.points_by_class,
+        "points_by_resource": model.points_by_resource,
+        "delivered_by_resource": model.delivered_by_resource,
+        "delivered_by_base": model.delivered_by_base,
+        "resources": [(resource.unique_id, resource.name, resource.carried) for resource in model.resources.values()],
+        "cells": cells,
+        "agents": [agent_state(agent) for agent in model.schedule.agents],
+        "blackboard": list(model.blackboard.resources),
+        "rendezvous": [(request.resource.unique_id, request.waiter.unique_id,
+                        request.partner.unique_id if request.partner is not None else None, request.opened)
+                       for request in model.rendezvous.pending.values()],
+        "cell_pool": (model.cell_pool.swaps, model.cell_pool.drawn),
+        "coverage": coverage_state(model.coverage) if model.coverage is not None else None,
+        "spawner": spawner_state(model.spawner) if model.spawner is not None else None,
+        "engine": engine_state(model.engine) if model.engine is not None else None,
+        "model_vars": model.datacollector.model_vars
+    }
+
+
+def save_checkpoint(model, path):
+    """Grava o estado do modelo em disco. A escrita é atômica: um arquivo parcial nunca substitui o anterior.
+    Eventos e linhas de coleta em buffer são gravados antes, para que as saídas acompanhem o checkpoint."""
+    model.flush()
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as checkpoint_file:
+        pickle.dump(model_state(model), checkpoint_file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, path)
+
+
+def load_checkpoint(path, **options):
+    """Reconstrói um ModelBase a partir de um checkpoint. options são repassadas ao construtor (event_sink, profile, collector, collect_every)."""
+    with open(path, "rb") as checkpoint_file:
+        state = pickle.load(checkpoint_file)
+    if state["version"] != CHECKPOINT_VERSION:
+        raise ValueError(f"Versão de checkpoint não suportada: {state['version']}")
+    return restore_model(state, **options)
+
+
+def restore_model(state, **options):
+    params = state["params"]
+    model = ModelBase(dict.fromkeys(AGENT_CLASSES, 0), dict.fromkeys(RESOURCE_CLASSES, 0), params["grid_params"],
+                      seed=params["seed"], engine=params["engine"], rendezvous_timeout=params["rendezvous_timeout"],
+                      exploration=params["exploration"], spawn_rates=params["spawn_rates"],
+                      spawn_limits=params["spawn_limits"], resume=True, **options)
+    model.num_agents = params["num_agents"]
+    model.num_resources = params["num_resources"]
+
+    if state["engine"] is not None:
+        restore_engine(model, state["engine"])
+
+    resources = {}
+    for unique_id, name, carried in state["resources"]:
+        resource = RESOURCE_TYPES[name](unique_id, model)
+        resource.carried = carried
+        resources[unique_id] = resource
+        model.resources[unique_id] = resource
+    lookup = lambda unique_id: resources[unique_id] if unique_id is not None else None
+
+    agents = {}
+    for saved in state["agents"]:
+        agent = AGENT_TYPES[saved["class"]](unique_id=saved["unique_id"], model=model, name=saved["name"])
+        agent.carrying = lookup(saved["carrying"])
+        agent.points = saved["points"]
+        agent.waiting = saved["waiting"]
+        agent.known_resources = [resources[unique_id] for unique_id in saved["known_resources"]]
+        agent.known_resources_set = set(agent.known_resources)
+        chunks, count = saved["visited"]
+        agent.visited_positions = VisitedMap(model.grid.width, model.grid.height)
+        agent.visited_positions.chunks = {key: bytearray(chunk) for key, chunk in chunks.items()}
+        agent.visited_positions.count = count
+        agents[agent.unique_id] = agent
+
+    # Recoloca os objetos de cada célula na ordem original, que decide quem coleta primeiro
+    for pos, keys in state["cells"].items():
+        for kind, unique_id in keys:
+            if kind == "r":
+                model.place_resource(resources[unique_id], pos)
+            elif kind == "a":
+                model.grid.place_agent(agents[unique_id], pos)
+
+    # Parceiros e participantes de coletas conjuntas podem ser agentes do motor vetorizado
+    def member(unique_id):
+        if unique_id in agents:
+            return agents[unique_id]
+        return model.engine.handle_by_id(unique_id) if model.engine is not None else None
+
+    for saved in state["agents"]:
+        agent = agents[saved["unique_id"]]
+        model.add_agent(agent, None)
+        if saved["partner"] is not None:
+            agent.partner = member(saved["partner"])
+        if saved.get("target") is not None:
+            model.planner.claim(agent, resources[saved["target"]])
+
+    if model.engine is not None:
+        model.engine.carrying[:] = [lookup(unique_id) for unique_id in state["engine"]["carrying"]]
+        model.engine.outside_partner[:] = [agents[unique_id] if unique_id is not None else None
+                                           for unique_id in state["engine"]["outside_partner"]]
+
+    for unique_id in state["blackboard"]:
+        model.blackboard.add(resources[unique_id])
+
+    # O registro restaurado só tem os recursos do quadro, então cada cursor volta a apontar para as entradas
+    # válidas que o agente ainda não tinha lido
+    for saved in state["agents"]:
+        if "desires" in saved:
+            agent = agents[saved["unique_id"]]
+            agent.cursor = model.blackboard.end - saved["unread"]
+            agent.desires = [(priority, unique_id, resources[unique_id]) for priority, unique_id in saved["desires"]]
+            heapq.heapify(agent.desires)
+            agent.intention = lookup(saved["intention"])
+            agent.intention_id = saved["intention"]
+            agent.keyed_at = saved["keyed_at"]
+
+    for resource_id, waiter_id, partner_id, opened in state["rendezvous"]:
+        request = PendingPickup(resources[resource_id], member(waiter_id), opened)
+        model.rendezvous.pending[resource_id] = request
+        if partner_id is not None:
+            model.rendezvous.assign(request, member(partner_id))
+
+    if state["coverage"] is not None:
+        restore_coverage(model.coverage, state["coverage"], agents)
+
+    if state["spawner"] is not None:
+        restore_spawner(model.spawner, state["spawner"])
+
+    model.cell_pool.swaps, model.cell_pool.drawn = state["cell_pool"]
+    model.random.setstate(state["random"])
+    model.schedule.steps = state["steps"]
+    model.schedule.time = state["time"]
+    model.running = state["running"]
+    model.current_id = state["current_id"]
+    model.resource_id = state["resource_id"]
+    model.num_resources_total = state["num_resources_total"]
+    model.num_resources_delivered = state["num_resources_delivered"]
+    model.total_points = state["total_points"]
+    model.points_by_class = state["points_by_class"]
+    model.points_by_resource = state["points_by_resource"]
+    model.delivered_by_resource = state["delivered_by_resource"]
+    model.delivered_by_base = state["delivered_by_base"]
+
+    saved_vars = state["model_vars"]
+    # Preenche as colunas existentes, que podem ser deques limitados, em vez de substituí-las
+    for key, values in model.datacollector.model_vars.items():
+        values.clear()
+        values.extend(saved_vars.get(key, [None] * state["steps"]))
+    return model
+
+
+def restore_coverage(coverage, saved, agents):
+    cells = coverage.width * coverage.height
+    seen = np.unpackbits(np.frombuffer(zlib.decompress(saved["seen"]), dtype=np.uint8), count=cells)
+    coverage.restore(seen.reshape(coverage.width, coverage.height).astype(bool))
+    coverage.targets = {agents[agent_id]: (cell, step) for agent_id, cell, step in saved["targets"]}
+    coverage.claims = {block: (agents[agent_id], step) for block, agent_id, step in saved["claims"]}
+
+
+def restore_spawner(spawner, saved):
+    for name, count in saved["pool"].items():
+        spawner.pool[name] = [spawner.resource_types[name](None, spawner.model) for _ in range(count)]
+    spawner.live = saved["live"]
+    meter = spawner.meter
+    steps, meter.delivered, meter.points, meter.delivered_sum, meter.points_sum = saved["meter"]
+    meter.steps.extend(steps)
+
+
+def restore_engine(model, saved):
+    kinds = saved["kind"]
+    counts = {name: int((kinds == kind).sum()) for kind, name in enumerate(VECTOR_AGENT_CLASSES)}
+    engine = VectorEngine(model, counts, int(saved["unique_ids"][0]) if len(kinds) else 1,
+                          [tuple(pos) for pos in saved["pos"].tolist()])
+    engine.pos = saved["pos"]
+    engine.carrying_mask = np.array([unique_id is not None for unique_id in saved["carrying"]], dtype=bool)
+    engine.waiting = saved["waiting"]
+    engine.partner = saved["partner"]
+    engine.goal = saved["goal"]
+    engine.points = saved["points"]
+    keys, chunks = saved["visited"]
+    engine.visited.put(keys, np.frombuffer(zlib.decompress(chunks), dtype=np.uint8).reshape(len(keys), CHUNK_BYTES))
+    engine.moves = saved["moves"]
+    engine.rng.bit_generator.state = saved["rng"]
+    model.engine = engine
+    if model.profiler is not None:
+        engine.step = model.profiler.timed(model.profiler.phases, "engine", engine.step)
+
+
+def run_with_checkpoints(model, path, every, max_steps=None):
+    """Executa o modelo até o fim, gravando um checkpoint a cada `every` passos e ao terminar."""
+    while model.running and (max_steps is None or model.schedule.steps < max_steps):
+        model.step()
+        if model.schedule.steps % every == 0:
+            save_checkpoint(model, path)
+    save_checkpoint(model, path)
+    return model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Retoma uma execução do ModelBase a partir de um checkpoint.")
+    parser.add_argument("checkpoint", help="Arquivo de checkpoint gravado por save_checkpoint.")
+    parser.add_argument("--every", type=int, default=1000, help="Grava um novo checkpoint a cada N passos.")
+    parser.add_argument("--max-steps", type=int, default=None, help="Para ao atingir este passo.")
+    args = parser.parse_args(argv)
+
+    model = load_checkpoint(args.checkpoint)
+    print(f"Retomando no passo {model.schedule.steps}.")
+    run_with_checkpoints(model, args.checkpoint, args.every, args.max_steps)
+    print(f"Passo {model.schedule.steps}: {model.total_points} pontos, "
+          f"{model.num_resources_delivered} de {model.num_resources_total} recursos entregues.")
+
+
+if __name__ == "__main__":
+    main()
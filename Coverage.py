@@ -0,0 +1,151 @@
+import numpy as np
+
+
+class CoverageMap:
+    """Mapa, no nível do modelo, das células já vistas por algum agente e da fronteira de exploração.
+
+    Uma célula é vista quando um agente exploratório passa por ela: StateAgent só coleta o que está na
+    própria célula, então só ela conta. A fronteira são as células não vistas vizinhas de células vistas;
+    ela é mantida incrementalmente a cada célula nova e guardada por blocos de block x block células,
+    para que a busca do alvo mais próximo percorra só os blocos com fronteira. Cada bloco é reservado
+    para um único agente por vez, o que espalha os agentes pela fronteira.
+    """
+
+    def __init__(self, width, height, block=8):
+        self.width = width
+        self.height = height
+        self.block = block
+        self.seen = np.zeros((width, height), dtype=bool)
+        self.count = 0
+        self.blocks = {}
+        self.targets = {}
+        self.claims = {}
+
+    def __len__(self):
+        """Número de células na fronteira."""
+        return sum(len(cells) for cells in self.blocks.values())
+
+    def mark(self, pos, radius=0):
+        """Marca como vistas as células a até radius da posição e atualiza a fronteira."""
+        x, y = pos
+        x0, y0 = max(0, x - radius), max(0, y - radius)
+        window = self.seen[x0:x + radius + 1, y0:y + radius + 1]
+        if window.all():
+            return
+        new_cells = [(x0 + int(dx), y0 + int(dy)) for dx, dy in zip(*np.nonzero(~window))]
+        for cell in new_cells:
+            self.seen[cell] = True
+            self._discard(cell)
+        self.count += len(new_cells)
+        for cx, cy in new_cells:
+            for cell in self.neighbours(cx, cy):
+                if not self.seen[cell]:
+                    self.blocks.setdefault((cell[0] // self.block, cell[1] // self.block), set()).add(cell)
+
+    def _discard(self, cell):
+        block = (cell[0] // self.block, cell[1] // self.block)
+        cells = self.blocks.get(block)
+        if cells is not None:
+            cells.discard(cell)
+            if not cells:
+                del self.blocks[block]
+
+    def nearest(self, pos, agent, step):
+        """Célula de fronteira mais próxima (distância de Chebyshev) fora dos blocos reservados por outros
+        agentes; se todos estiverem reservados, a mais próxima entre todas. None quando não há fronteira."""
+        if not self.blocks:
+            return None
+        x, y = pos
+        # Caso comum: o agente está na borda da área vista e uma vizinha é fronteira
+        for cell in self.neighbours(x, y):
+            block = (cell[0] // self.block, cell[1] // self.block)
+            if cell in self.blocks.get(block, ()) and not self.is_claimed(block, agent, step):
+                return cell
+        blocks = self.nearby_blocks(x // self.block, y // self.block, agent, step)
+        if blocks is None:
+            blocks = [block for block in self.blocks if not self.is_claimed(block, agent, step)] or list(self.blocks)
+        best = None
+        for block in blocks:
+            for cell in self.blocks[block]:
+                key = (max(abs(cell[0] - x), abs(cell[1] - y)), cell)
+                if best is None or key < best:
+                    best = key
+        return best[1]
+
+    def nearby_blocks(self, bx, by, agent, step):
+        """Blocos livres com fronteira no primeiro anel de blocos em volta de (bx, by) que tem algum, mais o
+        anel seguinte: uma célula mais distante que isso nunca é a mais próxima. Retorna None quando os
+        anéis percorridos já somam mais blocos que os que têm fronteira, e varrer todos sai mais barato."""
+        found = None
+        blocks = []
+        radius = 0
+        while (2 * radius + 1) ** 2 <= len(self.blocks):
+            for block in self.ring(bx, by, radius):
+                if block in self.blocks and not self.is_claimed(block, agent, step):
+                    blocks.append(block)
+            if found is None and blocks:
+                found = radius
+            if found is not None and radius > found:
+                return blocks
+            radius += 1
+        return None
+
+    def neighbours(self, x, y):
+        """Vizinhas de Moore dentro do grid, em ordem crescente de (x, y)."""
+        for nx in range(max(0, x - 1), min(self.width, x + 2)):
+            for ny in range(max(0, y - 1), min(self.height, y + 2)):
+                if (nx, ny) != (x, y):
+                    yield nx, ny
+
+    @staticmethod
+    def ring(bx, by, radius):
+        if radius == 0:
+            yield bx, by
+            return
+        for dx in range(-radius, radius + 1):
+            yield bx + dx, by - radius
+            yield bx + dx, by + radius
+        for dy in range(-radius + 1, radius):
+            yield bx - radius, by + dy
+            yield bx + radius, by + dy
+
+    def is_claimed(self, block, agent, step):
+        """Se o bloco está reservado por outro agente que explorou no passo atual ou no anterior."""
+        claim = self.claims.get(block)
+        return claim is not None and claim[0] is not agent and claim[1] >= step - 1
+
+    def claim(self, agent, cell, step):
+        """Registra cell como alvo do agente e reserva o bloco dela. Chamado a cada passo em que o agente
+        explora: reservas de agentes que pararam de explorar (carregando, esperando) expiram sozinhas."""
+        previous = self.targets.get(agent)
+        if previous is not None and previous[0] != cell:
+            self.release(agent)
+        self.targets[agent] = (cell, step)
+        self.claims[(cell[0] // self.block, cell[1] // self.block)] = (agent, step)
+
+    def release(self, agent):
+        target = self.targets.pop(agent, None)
+        if target is None:
+            return
+        block = (target[0][0] // self.block, target[0][1] // self.block)
+        claim = self.claims.get(block)
+        if claim is not None and claim[0] is agent:
+            del self.claims[block]
+
+    def target(self, agent):
+        target = self.targets.get(agent)
+        return target[0] if target is not None else None
+
+    def restore(self, seen):
+        """Recria o mapa a partir das células vistas, recalculando a fronteira."""
+        self.seen = seen
+        self.count = int(seen.sum())
+        padded = np.pad(seen, 1)
+        near_seen = np.zeros_like(seen)
+        for dx in (0, 1, 2):
+            for dy in (0, 1, 2):
+                near_seen |= padded[dx:dx + self.width, dy:dy + self.height]
+        self.blocks = {}
+        for x, y in zip(*np.nonzero(near_seen & ~seen)):
+            cell = (int(x), int(y))
+            self.blocks.setdefault((cell[0] // self.block, cell[1] // self.block), set()).add(cell)
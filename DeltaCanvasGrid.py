@@ -0,0 +1,70 @@
+import os
+
+from mesa.visualization.ModularVisualization import VisualizationElement
+
+from AgentPortrayal import engine_portrayal, clear_portrayal_cache
+
+
+def cell_changes(previous, cells):
+    """Células de cells cujos portrayals diferem dos de previous, mais as que esvaziaram (com lista vazia)."""
+    changes = [[x, y, portrayals] for (x, y), portrayals in cells.items() if previous.get((x, y)) != portrayals]
+    changes.extend([x, y, []] for (x, y) in previous if (x, y) not in cells)
+    return changes
+
+
+class DeltaCanvasGrid(VisualizationElement):
+    """Grid do navegador que envia só as células que mudaram desde o último quadro.
+
+    O primeiro quadro de cada modelo vai completo; os seguintes trazem, por célula alterada, a nova
+    lista de portrayals (vazia quando a célula esvaziou). Com render_every > 1 os passos intermediários
+    não geram quadro, e o próximo quadro acumula as mudanças deles. As células são montadas a partir
+    dos agentes e recursos do modelo, não de uma varredura do grid, e incluem os agentes vetorizados.
+    """
+
+    package_includes = ["GridDraw.js"]
+    local_includes = ["DeltaCanvasModule.js"]
+    local_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "js")
+
+    def __init__(self, portrayal_method, grid_width, grid_height, canvas_width=500, canvas_height=500,
+                 render_every=1):
+        super().__init__()
+        self.portrayal_method = portrayal_method
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.canvas_width = canvas_width
+        self.canvas_height = canvas_height
+        self.render_every = render_every
+        self.model = None
+        self.cells = {}
+        self.js_code = (f"elements.push(new DeltaCanvasModule({canvas_width}, {canvas_height}, "
+                        f"{grid_width}, {grid_height}));")
+
+    def render(self, model):
+        full = model is not self.model
+        if not full and model.running and model.schedule.steps % self.render_every:
+            return None
+        if full:
+            self.model = model
+            self.cells = {}
+            clear_portrayal_cache()
+
+        cells = self.collect_cells(model)
+        changes = cell_changes(self.cells, cells)
+        self.cells = cells
+        return {"full": full, "cells": changes}
+
+    def collect_cells(self, model):
+        cells = {}
+        objects = list(model.bases)
+        objects.extend(resource for resource in model.resources.values() if not resource.carried)
+        objects.extend(agent for agent in model.schedule.agents if agent.pos is not None)
+        for obj in objects:
+            portrayal = self.portrayal_method(obj)
+            if portrayal:
+                cells.setdefault(obj.pos, []).append(portrayal)
+
+        engine = model.engine
+        if engine is not None:
+            for index, (x, y) in enumerate(engine.pos.tolist()):
+                cells.setdefault((x, y), []).append(engine_portrayal(engine, index))
+        return cells
@@ -0,0 +1,103 @@
+import json
+from collections import deque
+
+PICKUP = "pickup"
+WAIT = "wait"
+DELIVER = "deliver"
+FINISH = "finish"
+INIT = "init"
+SPAWN = "spawn"
+
+
+class EventSink:
+    """Destino de eventos do modelo. Subclasses implementam write()."""
+
+    def record(self, step, kind, agent_id=None, **data):
+        self.write((step, kind, agent_id, data))
+
+    def write(self, event):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class MemoryEventSink(EventSink):
+    """Mantém os últimos eventos em um buffer circular em memória."""
+
+    def __init__(self, capacity=10000):
+        self.events = deque(maxlen=capacity)
+
+    def write(self, event):
+        self.events.append(event)
+
+
+class JsonlEventSink(EventSink):
+    """Acumula eventos e os grava em blocos em um arquivo JSON Lines."""
+
+    def __init__(self, path, buffer_size=1000):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.file = open(path, "a")
+
+    def write(self, event):
+        self.buffer.append(event)
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer and not self.file.closed:
+            lines = []
+            for step, kind, agent_id, data in self.buffer:
+                lines.append(json.dumps({"step": step, "kind": kind, "agent_id": agent_id, **data}))
+            self.file.write("\n".join(lines) + "\n")
+            self.file.flush()
+        self.buffer.clear()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+class PrintEventSink(EventSink):
+    """Imprime os eventos no console com as mesmas mensagens usadas antes do log estruturado."""
+
+    def write(self, event):
+        step, kind, agent_id, data = event
+        if kind == PICKUP:
+            if data.get("partner"):
+                print(f"{data['agent']} e {data['partner']} coletaram {data['resource']}.")
+            else:
+                print(f"{data['agent']} coletou {data['resource']}.")
+        elif kind == WAIT:
+            print(f"{data['agent']} está esperando por mais um agente para coletar {data['resource']} em {data['pos']}.")
+        elif kind == DELIVER:
+            print(f"{data['agent']} entregou {data['resource']} na base e ganhou {data['value']} pontos.")
+        elif kind == SPAWN:
+            print(f"{data['resource']} surgiu em {data['pos']}.")
+        elif kind == INIT:
+            print(f"Modelo inicializado com {data['num_agents']} agentes e {data['num_resources']} recursos.")
+        elif kind == FINISH:
+            print("\nSimulação finalizada. Pontos coletados por cada agente:")
+            for name, unique_id, points in data["points"]:
+                print(f"{name} (ID: {unique_id}): {points} pontos")
+            print(f"Total de pontos coletados por todos os agentes: {data['total_points']}")
+
+
+def make_event_sink(spec):
+    """Cria um destino de eventos a partir de None/'off', 'memory', 'print', um caminho .jsonl ou uma instância."""
+    if spec is None or spec == "off":
+        return None
+    if isinstance(spec, EventSink):
+        return spec
+    if spec == "memory":
+        return MemoryEventSink()
+    if spec == "print":
+        return PrintEventSink()
+    if isinstance(spec, str) and spec.endswith(".jsonl"):
+        return JsonlEventSink(spec)
+    raise ValueError(f"Destino de eventos desconhecido: {spec!r}")
@@ -0,0 +1,168 @@
+import threading
+import time
+
+import tornado.escape
+import tornado.ioloop
+from tornado.websocket import WebSocketClosedError
+from mesa.visualization.ModularVisualization import ModularServer, SocketHandler
+
+from AgentPortrayal import clear_portrayal_cache
+from DeltaCanvasGrid import DeltaCanvasGrid, cell_changes
+
+
+class Frame:
+    """Amostra do estado do modelo para os navegadores: células do grid e estado dos demais elementos."""
+
+    __slots__ = ("step", "cells", "states", "running")
+
+    def __init__(self, step, cells, states, running):
+        self.step = step
+        self.cells = cells
+        self.states = states
+        self.running = running
+
+
+class SimulationWorker(threading.Thread):
+    """Avança o modelo em segundo plano, o mais rápido possível, sem esperar pelos navegadores.
+
+    A cada frame_interval segundos monta um Frame entre dois passos, na própria thread, e o publica em
+    self.frame; quem publica para os navegadores só lê o Frame mais recente, nunca o modelo.
+    """
+
+    def __init__(self, model, grid, elements, frame_interval, max_steps):
+        super().__init__(daemon=True)
+        self.model = model
+        self.grid = grid
+        self.elements = elements
+        self.frame_interval = frame_interval
+        self.max_steps = max_steps
+        self.frame = None
+        self.stopped = threading.Event()
+
+    def run(self):
+        model = self.model
+        self.sample()
+        next_frame = time.perf_counter() + self.frame_interval
+        while model.running and not self.stopped.is_set() and model.schedule.steps < self.max_steps:
+            model.step()
+            now = time.perf_counter()
+            if now >= next_frame:
+                self.sample()
+                next_frame = now + self.frame_interval
+        self.sample()
+
+    def sample(self):
+        model = self.model
+        states = [None if element is self.grid else element.render(model) for element in self.elements]
+        self.frame = Frame(model.schedule.steps, self.grid.collect_cells(model), states, model.running)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class LiveSocketHandler(SocketHandler):
+    """Conexão de um navegador com o LiveServer. O modelo não é avançado por get_step: os quadros chegam
+    sozinhos, na taxa do servidor."""
+
+    def open(self):
+        self.sent_frame = None
+        self.pending = None
+        self.dropped = 0
+        super().open()
+        self.application.viewers.add(self)
+
+    def on_close(self):
+        self.application.viewers.discard(self)
+
+    def on_message(self, message):
+        msg = tornado.escape.json_decode(message)
+        if msg["type"] == "get_step":
+            return
+        if msg["type"] == "reset":
+            self.application.reset_viewer(self)
+            return
+        super().on_message(message)
+        if msg["type"] == "submit_params":
+            self.application.params_changed = True
+
+
+class LiveServer(ModularServer):
+    """ModularServer em que o modelo roda em uma thread própria e os quadros são empurrados aos navegadores.
+
+    Um PeriodicCallback no loop asyncio do tornado envia, frames_per_second vezes por segundo, o Frame
+    mais recente a cada navegador conectado, com só as células que mudaram desde o último quadro que
+    aquele navegador recebeu. Um navegador que ainda não terminou de receber o quadro anterior perde o
+    atual em vez de acumular uma fila; vários navegadores assistem à mesma execução sem atrasá-la.
+    Um "reset" vindo do navegador só reinicia a execução se os parâmetros mudaram ou se ela terminou;
+    caso contrário aquele navegador apenas recebe o próximo quadro completo.
+    """
+
+    def __init__(self, model_cls, visualization_elements, name="Mesa Model", model_params=None, port=None,
+                 frames_per_second=10):
+        self.frames_per_second = frames_per_second
+        self.viewers = set()
+        self.worker = None
+        self.params_changed = False
+        grids = [element for element in visualization_elements if isinstance(element, DeltaCanvasGrid)]
+        if not grids:
+            raise ValueError("O LiveServer precisa de um DeltaCanvasGrid entre os elementos de visualização.")
+        self.grid = grids[0]
+        super().__init__(model_cls, visualization_elements, name, model_params, port)
+        # Regras adicionadas depois do construtor têm precedência sobre o /ws do ModularServer
+        self.add_handlers(r".*", [(r"/ws", LiveSocketHandler)])
+        self.grid_index = self.visualization_elements.index(self.grid)
+        self.publisher = None
+
+    def reset_model(self):
+        if self.worker is not None:
+            self.worker.stop()
+        super().reset_model()
+        clear_portrayal_cache()
+        self.params_changed = False
+        self.worker = SimulationWorker(self.model, self.grid, self.visualization_elements,
+                                       1 / self.frames_per_second, self.max_steps)
+        self.worker.start()
+        for viewer in self.viewers:
+            viewer.sent_frame = None
+
+    def reset_viewer(self, viewer):
+        if self.params_changed or not self.model.running:
+            self.reset_model()
+        else:
+            viewer.sent_frame = None
+
+    def publish(self):
+        """Envia o Frame mais recente a cada navegador que não o tem e não está ocupado com o anterior."""
+        frame = self.worker.frame
+        if frame is None:
+            return
+        deltas = {}
+        for viewer in list(self.viewers):
+            previous = viewer.sent_frame
+            if previous is frame:
+                continue
+            if viewer.pending is not None and not viewer.pending.done():
+                viewer.dropped += 1
+                continue
+            # Navegadores que receberam o mesmo quadro anterior recebem o mesmo delta
+            grid_state = deltas.get(previous)
+            if grid_state is None:
+                grid_state = {"full": previous is None,
+                              "cells": cell_changes(previous.cells if previous is not None else {}, frame.cells)}
+                deltas[previous] = grid_state
+            data = list(frame.states)
+            data[self.grid_index] = grid_state
+            try:
+                viewer.pending = viewer.write_message({"type": "viz_state", "data": data})
+                if not frame.running:
+                    viewer.write_message({"type": "end"})
+            except WebSocketClosedError:
+                self.viewers.discard(viewer)
+                continue
+            viewer.sent_frame = frame
+
+    def launch(self, port=None, open_browser=True):
+        self.publisher = tornado.ioloop.PeriodicCallback(self.publish, 1000 / self.frames_per_second)
+        self.publisher.start()
+        super().launch(port, open_browser)
@@ -1,120 +1,323 @@
 from mesa import Model
-from mesa.time import RandomActivation
 from mesa.space import MultiGrid
-from mesa.datacollection import DataCollector
 
 from Agents import *
 from Resources import *
+from EventLog import make_event_sink, INIT, FINISH
+from ResourceIndex import ResourceIndex
+from Blackboard import Blackboard
+from VectorEngine import VectorEngine, VECTOR_AGENT_CLASSES
+from Planner import Planner, base_field
+from CellPool import CellPool
+from Profiler import StepProfiler
+from ActiveScheduler import ActiveScheduler
+from Rendezvous import Rendezvous
+from StreamingCollector import make_collector
+from Coverage import CoverageMap
+from Spawner import ResourceSpawner
+
+AGENT_CLASSES = ["SimpleAgent", "StateAgent", "ObjectiveAgent", "UtilityAgent", "BDIAgent"]
+RESOURCE_CLASSES = ["EnergeticCrystal", "RareMetalBlock", "AncientStructure"]
+EXPLORATION_MODES = ["random", "frontier"]
+SPAWN_COLLECT_WINDOW = 10000 #Coletas mantidas em memória nas execuções com geração contínua
+AGENT_TYPES = {
+    "SimpleAgent": SimpleAgent,
+    "StateAgent": StateAgent,
+    "ObjectiveAgent": ObjectiveAgent,
+    "UtilityAgent": UtilityAgent,
+    "BDIAgent": BDIAgent
+}
+RESOURCE_TYPES = {
+    "EnergeticCrystal": EnergeticCrystal,
+    "RareMetalBlock": RareMetalBlock,
+    "AncientStructure": AncientStructure
+}
+AGENT_REPORTERS = {
+    "Class": lambda agent: type(agent).__name__,
+    "X": lambda agent: agent.pos[0],
+    "Y": lambda agent: agent.pos[1],
+    "Points": "points",
+    "Carrying": lambda agent: agent.carrying.unique_id if agent.carrying is not None else None,
+    "Waiting": "waiting"
+}
+
+
+def totals_reporters(num_bases=1):
+    """Reporters do DataCollector lidos dos totais mantidos incrementalmente, em O(1) por passo."""
+    reporters = {"TotalPoints": "total_points"}
+    for name in AGENT_CLASSES:
+        reporters[f"{name}Points"] = lambda model, name=name: model.points_by_class[name]
+    for name in RESOURCE_CLASSES:
+        reporters[f"{name}Points"] = lambda model, name=name: model.points_by_resource[name]
+        reporters[f"{name}Delivered"] = lambda model, name=name: model.delivered_by_resource[name]
+    for index in range(num_bases):
+        reporters[f"Base{index}Delivered"] = lambda model, index=index: model.delivered_by_base[index]
+    return reporters
 
 class ModelBase(Model):
-    def __init__(self, num_agents, num_resources, grid_params):
+    def __init__(self, num_agents, num_resources, grid_params, seed=None, event_sink=None, engine=None,
+                 profile=False, collector=None, collect_every=1, rendezvous_timeout=None,
+                 exploration="random", spawn_rates=None, spawn_limits=None, resume=False):
         super().__init__()
+        if seed is not None:
+            self.reset_randomizer(seed)
+        self.events = make_event_sink(event_sink)
+        self.profiler = None
+        self.engine = None
+        self.engine_name = engine
+        self.spawner = None
+        self.collect_every = collect_every
         self.current_id = 0
         self.num_agents = num_agents
         self.num_resources = num_resources
+        self.grid_params = grid_params
+        self.resources = {}
         self.grid = MultiGrid(grid_params["width"], grid_params["height"], False)
-        self.schedule = RandomActivation(self)
+        self.resource_index = ResourceIndex(grid_params["width"], grid_params["height"])
+        self.schedule = ActiveScheduler(self)
         self.running = True
         self.resource_id = 1000
         self.num_resources_total = 0
         self.bdi_agents = []
+        self.blackboard = Blackboard(self.bdi_agents)
 
-        self.base_position = (0, 0)
-        self.base = Base(self.next_id(), self, self.base_position)
-        self.grid.place_agent(self.base, self.base_position)
+        # grid_params["bases"] lista as posições das bases; cada agente entrega na mais próxima
+        self.base_positions = [tuple(pos) for pos in grid_params.get("bases", [(0, 0)])]
+        if not self.base_positions:
+            raise ValueError("É preciso ao menos uma base.")
+        self.bases = []
+        for index, pos in enumerate(self.base_positions):
+            if not (0 <= pos[0] < self.grid.width and 0 <= pos[1] < self.grid.height):
+                raise ValueError(f"A base {pos} está fora do grid {self.grid.width}x{self.grid.height}.")
+            name = "Base" if len(self.base_positions) == 1 else f"Base_{index}"
+            base = Base(self.next_id(), self, pos, name=name)
+            self.grid.place_agent(base, pos)
+            self.bases.append(base)
+        self.base = self.bases[0]
+        self.base_position = self.base_positions[0]
+        self.base_lookup, self.base_distance = base_field(self.grid.width, self.grid.height, self.base_positions)
+        self.delivered_by_base = [0] * len(self.bases)
+        self.planner = Planner(self)
+        if rendezvous_timeout is None:
+            rendezvous_timeout = self.grid.width + self.grid.height
+        self.rendezvous = Rendezvous(self, rendezvous_timeout)
+        if exploration not in EXPLORATION_MODES:
+            raise ValueError(f"Modo de exploração desconhecido: {exploration!r}")
+        self.exploration = exploration
+        self.coverage = CoverageMap(self.grid.width, self.grid.height) if exploration == "frontier" else None
+
+        total_agents = sum(self.num_agents[name] for name in AGENT_CLASSES)
+        capacity = self.grid.width * self.grid.height - len(set(self.base_positions))
+        if total_agents > capacity:
+            raise ValueError(f"O grid {self.grid.width}x{self.grid.height} comporta no máximo {capacity} agentes, "
+                             f"mas foram pedidos {total_agents}.")
+        self.cell_pool = CellPool(self.grid.width, self.grid.height, self.random)
 
         id = 0
-        for i in range(self.num_agents["SimpleAgent"]):
-            agent = SimpleAgent(unique_id=id + 1, model=self, name=f"SimpleAgent_{id + 1}")
-            self.grid.place_agent(agent, self.find_random_empty_cell())
-            self.schedule.add(agent)
-            id += 1
-
-        for i in range(self.num_agents["StateAgent"]):
-            agent = StateAgent(unique_id=id + 1, model=self, name=f"StateAgent_{id + 1}")
-            self.grid.place_agent(agent, self.find_random_empty_cell())
-            self.schedule.add(agent)
-            id += 1
-
-        for i in range(self.num_agents["ObjectiveAgent"]):
-            agent = ObjectiveAgent(unique_id=id + 1, model=self, name=f"ObjectiveAgent_{id + 1}")
-            self.grid.place_agent(agent, self.find_random_empty_cell())
-            self.schedule.add(agent)
-            id += 1
-
-        for i in range(self.num_agents["UtilityAgent"]):
-            agent = UtilityAgent(unique_id=id + 1, model=self, name=f"UtilityAgent_{id + 1}")
-            self.grid.place_agent(agent, self.find_random_empty_cell())
-            self.schedule.add(agent)
-            id += 1
-
-        for i in range(self.num_agents["BDIAgent"]):
-            bdi_agent = BDIAgent(unique_id=id + 1, model=self, name=f"BDIAgent_{id + 1}")
-            self.grid.place_agent(bdi_agent, self.find_random_empty_cell())
-            self.schedule.add(bdi_agent)
-            id += 1
-            self.bdi_agents.append(bdi_agent)
+        if engine == "vector":
+            vector_agents = {name: self.num_agents[name] for name in VECTOR_AGENT_CLASSES}
+            positions = [self.draw_agent_cell() for _ in range(sum(vector_agents.values()))]
+            self.engine = VectorEngine(self, vector_agents, id + 1, positions)
+            id += self.engine.num_agents
+            scheduled_classes = [name for name in AGENT_CLASSES if name not in VECTOR_AGENT_CLASSES]
+        elif engine is not None:
+            raise ValueError(f"Motor de simulação desconhecido: {engine!r}")
+        else:
+            scheduled_classes = AGENT_CLASSES
+
+        for name in scheduled_classes:
+            agent_class = AGENT_TYPES[name]
+            for _ in range(self.num_agents[name]):
+                id += 1
+                agent = agent_class(unique_id=id, model=self, name=f"{name}_{id}")
+                self.add_agent(agent, self.draw_agent_cell())
 
         self.num_resources_delivered = 0
-        resource_types = [("EnergeticCrystal", num_resources["EnergeticCrystal"]),
-                          ("RareMetalBlock", num_resources["RareMetalBlock"]),
-                          ("AncientStructure", num_resources["AncientStructure"])]
+        self.total_points = 0
+        self.points_by_class = dict.fromkeys(AGENT_CLASSES, 0)
+        self.points_by_resource = dict.fromkeys(RESOURCE_CLASSES, 0)
+        self.delivered_by_resource = dict.fromkeys(RESOURCE_CLASSES, 0)
 
-        for resource_type, quantity in resource_types:
+        for name in RESOURCE_CLASSES:
+            resource_class = RESOURCE_TYPES[name]
+            quantity = num_resources[name]
             for _ in range(quantity):
-                if resource_type == "EnergeticCrystal":
-                    resource = EnergeticCrystal(self.resource_id, self)
-                    self.num_resources_total += 1
-                elif resource_type == "RareMetalBlock":
-                    resource = RareMetalBlock(self.resource_id, self)
-                    self.num_resources_total += 1
-                elif resource_type == "AncientStructure":
-                    resource = AncientStructure(self.resource_id, self)
-                    self.num_resources_total += 1
+                resource = resource_class(self.resource_id, self)
                 self.resource_id += 1
-                x = self.random.randrange(self.grid.width)
-                y = self.random.randrange(self.grid.height)
-                self.grid.place_agent(resource, (x, y))
+                self.place_resource(resource, (self.random.randrange(self.grid.width),
+                                               self.random.randrange(self.grid.height)))
+            self.num_resources_total += quantity
+
+        # Execução sem fim: recursos novos a cada passo, até spawn_limits vivos por classe (padrão: a
+        # quantidade inicial)
+        if spawn_rates is not None:
+            limits = {name: max(1, num_resources[name]) for name in RESOURCE_CLASSES}
+            limits.update(spawn_limits or {})
+            self.spawner = ResourceSpawner(self, spawn_rates, limits, RESOURCE_TYPES)
+            self.spawner.live.update((name, num_resources[name]) for name in RESOURCE_CLASSES)
+
+        if self.events is not None:
+            self.events.record(0, INIT, num_agents=self.num_agents, num_resources=self.num_resources_total)
+
+        self.profiler = StepProfiler(self) if profile else None
+        # Sem fim, a coleta em memória guarda só uma janela das últimas linhas
+        window = SPAWN_COLLECT_WINDOW if self.spawner is not None else None
+        self.datacollector = make_collector(collector, self.build_model_reporters(), AGENT_REPORTERS, resume=resume,
+                                            window=window)
+        if self.profiler is not None:
+            self.profiler.install()
+
+    def params(self):
+        """Parâmetros que reconstroem este modelo, incluindo a semente efetivamente usada."""
+        return {
+            "num_agents": self.num_agents,
+            "num_resources": self.num_resources,
+            "grid_params": self.grid_params,
+            "seed": self._seed,
+            "engine": self.engine_name,
+            "rendezvous_timeout": self.rendezvous.timeout,
+            "exploration": self.exploration,
+            "spawn_rates": self.spawner.rates if self.spawner is not None else None,
+            "spawn_limits": self.spawner.limits if self.spawner is not None else None
+        }
 
-        print(f"Modelo inicializado com {self.num_agents} agentes e {self.num_resources_total} recursos.")
+    def build_model_reporters(self):
+        """Reporters dos totais do modelo e, com profile, os do profiler."""
+        reporters = totals_reporters(len(self.bases))
+        if self.spawner is not None:
+            reporters.update(self.spawner.reporters(AGENT_CLASSES))
+        if self.profiler is not None:
+            reporters.update(self.profiler.reporters())
+        return reporters
 
-        self.datacollector = DataCollector(
-            model_reporters={"TotalPoints": self.compute_total_points}
-        )
+    def record_delivery(self, agent_class, resource, partner_class=None, pos=None):
+        """Atualiza os totais de pontos e entregas quando um agente entrega um recurso na base em pos. Um recurso
+        coletado em dupla é contado uma vez, com o valor dividido entre as classes dos dois agentes."""
+        value = resource.value
+        if partner_class is not None:
+            share = value // resource.required_agents
+            value -= share
+            self.points_by_class[partner_class] = self.points_by_class.get(partner_class, 0) + share
+        self.total_points += resource.value
+        self.points_by_class[agent_class] = self.points_by_class.get(agent_class, 0) + value
+        self.points_by_resource[resource.name] = self.points_by_resource.get(resource.name, 0) + resource.value
+        self.num_resources_delivered += 1
+        self.delivered_by_resource[resource.name] = self.delivered_by_resource.get(resource.name, 0) + 1
+        if pos is not None:
+            self.delivered_by_base[self.base_lookup[pos]] += 1
+        if self.spawner is not None:
+            self.spawner.recycle(resource)
 
-    def find_random_empty_cell(self):
-        while True:
+    def add_agent(self, agent, pos):
+        """Coloca um agente no grid e no schedule."""
+        if pos is not None:
+            self.grid.place_agent(agent, pos)
+        self.schedule.add(agent)
+        if isinstance(agent, BDIAgent):
+            self.bdi_agents.append(agent)
+        if self.profiler is not None:
+            self.profiler.instrument(agent)
+
+    def draw_agent_cell(self):
+        """Sorteia, sem reposição, uma célula vazia para um agente novo."""
+        cell = self.cell_pool.draw_empty(self.grid)
+        if cell is None:
+            raise ValueError(f"Não há células vazias no grid {self.grid.width}x{self.grid.height} para mais agentes.")
+        return cell
+
+    def place_resource(self, resource, pos):
+        """Coloca um recurso no grid e no índice espacial de recursos."""
+        self.resources[resource.unique_id] = resource
+        self.grid.place_agent(resource, pos)
+        self.resource_index.add(resource, pos)
+        if self.engine is not None:
+            self.engine.resource_placed(resource, pos)
+
+    def pick_up_resource(self, resource):
+        """Remove um recurso coletado do grid e do índice de recursos e encerra a coleta conjunta pendente."""
+        resource.carried = True
+        self.rendezvous.close(resource)
+        self.resource_index.remove(resource, resource.pos)
+        self.blackboard.remove(resource)
+        if self.engine is not None:
+            self.engine.resource_removed(resource, resource.pos)
+        self.grid.remove_agent(resource)
+
+    def nearest_base(self, pos):
+        """Base mais próxima da posição, lida da tabela pré-calculada em O(1)."""
+        return self.bases[self.base_lookup[pos]]
+
+    def find_random_empty_cell(self, max_tries=100):
+        """Sorteia uma célula vazia. Após max_tries sorteios sem sucesso, escolhe entre as células vazias restantes."""
+        for _ in range(max_tries):
             x = self.random.randrange(self.grid.width)
             y = self.random.randrange(self.grid.height)
             cell = (x, y)
-            if not self.grid.is_cell_empty(cell):
-                continue
-            return cell
+            if self.grid.is_cell_empty(cell):
+                return cell
+        empty_cells = [(x, y) for x in range(self.grid.width) for y in range(self.grid.height)
+                       if self.grid.is_cell_empty((x, y))]
+        if not empty_cells:
+            raise ValueError("Não há células vazias no grid.")
+        return self.random.choice(empty_cells)
 
     def step(self):
+        if self.spawner is not None:
+            self.spawner.step()
+        self.rendezvous.step()
+        if self.planner.agents:
+            self.planner.plan()
+        if self.engine is not None:
+            self.engine.step()
         self.schedule.step()
-        self.datacollector.collect(self)
 
         #print(f"Foram entregues {self.num_resources_delivered}")
         #print(f"Deveriam ser entregues {self.num_resources_total}")
 
-        if self.num_resources_delivered >= self.num_resources_total:
+        if self.spawner is not None:
+            self.spawner.meter.update(self)
+        finished = self.spawner is None and self.num_resources_delivered >= self.num_resources_total
+        if finished or self.schedule.steps % self.collect_every == 0:
+            self.datacollector.collect(self)
+
+        if finished:
             self.running = False
 
-            print("\nSimulação finalizada. Pontos coletados por cada agente:")
-            agents_with_points = [
-                agent for agent in self.schedule.agents if hasattr(agent, 'points')
-            ]
-            agents_with_points.sort(key=lambda agent: agent.points, reverse=True)
-            for agent in agents_with_points:
-                print(f"{agent.name} (ID: {agent.unique_id}): {agent.points} pontos")
+            if self.events is not None:
+                agents_with_points = [
+                    (agent.name, agent.unique_id, agent.points)
+                    for agent in self.schedule.agents if hasattr(agent, 'points')
+                ]
+                if self.engine is not None:
+                    agents_with_points.extend(self.engine.agent_points())
+                agents_with_points.sort(key=lambda agent: agent[2], reverse=True)
+                self.events.record(self.schedule.steps, FINISH, points=agents_with_points,
+                                   total_points=self.total_points)
+            self.close()
 
-            total_points = sum(agent.points for agent in agents_with_points)
-            print(f"Total de pontos coletados por todos os agentes: {total_points}")
+    def flush(self):
+        """Grava em disco os eventos e as linhas de coleta ainda em buffer."""
+        if self.events is not None:
+            self.events.flush()
+        if hasattr(self.datacollector, "flush"):
+            self.datacollector.flush()
+
+    def close(self):
+        """Grava o que ainda está em buffer e fecha o destino de eventos, ao fim da execução."""
+        self.flush()
+        if self.events is not None:
+            self.events.close()
 
     def compute_total_points(self):
-        total = sum([agent.points for agent in self.schedule.agents if hasattr(agent, 'points')])
-        return total
+        return self.total_points
+
+    def visited_bytes_per_agent(self):
+        """Memória média, em bytes, do mapa de posições visitadas de cada agente."""
+        sizes = [agent.visited_positions.nbytes for agent in self.schedule.agents
+                 if hasattr(agent, 'visited_positions')]
+        if self.engine is not None:
+            sizes.extend(self.engine.visited_nbytes())
+        return sum(sizes) / len(sizes) if sizes else 0
 
     def next_id(self):
         self.current_id += 1
@@ -0,0 +1,102 @@
+import numpy as np
+
+
+def base_field(width, height, positions):
+    """Para cada célula, o índice da base mais próxima e o número de passos de move_towards até ela
+    (distância de Chebyshev). Empates ficam com a base listada primeiro."""
+    xs = np.arange(width)[:, None]
+    ys = np.arange(height)[None, :]
+    nearest = np.zeros((width, height), dtype=np.int32)
+    distance = np.full((width, height), np.iinfo(np.int32).max, dtype=np.int32)
+    for index, (x, y) in enumerate(positions):
+        to_base = np.maximum(np.abs(xs - x), np.abs(ys - y))
+        closer = to_base < distance
+        nearest[closer] = index
+        distance[closer] = to_base[closer]
+    return nearest, distance
+
+
+class Planner:
+    """Escolhe, em lote, o recurso alvo de cada ObjectiveAgent e UtilityAgent.
+
+    Cada agente pontua os recursos que conhece com o seu método score(). O planejador atribui os
+    alvos de todos os agentes ociosos de uma vez, do melhor par (agente, recurso) para o pior, sem
+    que mais agentes do que required_agents persigam o mesmo recurso. Alvos já atribuídos são
+    mantidos até o recurso ser coletado, então só os agentes sem alvo são replanejados a cada passo.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.agents = []
+        self.claims = {}
+        self.base_distance = model.base_distance
+
+    def register(self, agent):
+        self.agents.append(agent)
+
+    def claim(self, agent, resource):
+        agent.target = resource
+        self.claims.setdefault(resource.unique_id, []).append(agent)
+
+    def release(self, agent):
+        """Libera o alvo do agente, por exemplo quando ele coletou algum recurso."""
+        resource = agent.target
+        agent.target = None
+        if resource is None:
+            return
+        claimants = self.claims.get(resource.unique_id)
+        if claimants is not None:
+            if agent in claimants:
+                claimants.remove(agent)
+            if not claimants:
+                del self.claims[resource.unique_id]
+
+    def plan(self, agents=None):
+        """Atribui alvos aos agentes sem alvo válido."""
+        idle = []
+        for agent in self.agents if agents is None else agents:
+            if agent.target is not None and agent.target.carried:
+                self.release(agent)
+            if (agent.target is None and not agent.carrying and not agent.waiting and agent.rendezvous is None
+                    and agent.known_resources):
+                idle.append(agent)
+        if not idle:
+            return
+
+        candidates = []
+        for agent in idle:
+            self.forget_collected(agent)
+            x, y = agent.pos
+            for resource in agent.known_resources:
+                rx, ry = resource.pos
+                distance = max(abs(rx - x), abs(ry - y))
+                score = agent.score(resource, distance, int(self.base_distance[rx, ry]))
+                candidates.append((score, agent.unique_id, agent, resource))
+        candidates.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+
+        assigned = set()
+        for _, _, agent, resource in candidates:
+            if agent in assigned:
+                continue
+            if len(self.claims.get(resource.unique_id, ())) >= resource.required_agents:
+                continue
+            self.claim(agent, resource)
+            assigned.add(agent)
+
+        # Recursos que exigem dois agentes e ficaram com um só interessado prendem o agente esperando;
+        # ele volta ao planejamento restrito aos recursos que consegue coletar sozinho.
+        alone = [agent for agent in assigned
+                 if agent.target.required_agents > len(self.claims[agent.target.unique_id])]
+        for agent in alone:
+            self.release(agent)
+        for _, _, agent, resource in candidates:
+            if agent not in alone or agent.target is not None or resource.required_agents > 1:
+                continue
+            if resource.unique_id not in self.claims:
+                self.claim(agent, resource)
+
+    def forget_collected(self, agent):
+        """Remove da memória do agente os recursos que já foram coletados por outros."""
+        if any(resource.carried for resource in agent.known_resources):
+            agent.known_resources = [resource for resource in agent.known_resources if not resource.carried]
+            agent.known_resources_set = set(agent.known_resources)
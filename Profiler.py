@@ -0,0 +1,138 @@
+import functools
+import time
+
+AGENT_METHODS = [
+    "move_towards", "explore", "random_move_to_unvisited_position", "random_move", "check_resources",
+    "inform_resource_to_bdi", "collect_any_resource", "collect_simple_resource", "deliver_resource",
+    "deliberate", "execute_intention"
+]
+
+COUNTERS = ["Moves", "Pickups", "Waits", "Deliveries"]
+
+
+class StepProfiler:
+    """Instrumentação opcional de um ModelBase: tempo por fase do passo, por classe de agente e por método.
+
+    Os métodos são envolvidos por instância (agente, grid, schedule, planejador), então um modelo
+    sem profiler não paga nada e outros modelos no mesmo processo não são afetados.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.steps = 0
+        self.phases = {}
+        self.classes = {}
+        self.methods = {}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.engine_moves = 0
+
+    def install(self):
+        model = self.model
+        model.step = self.timed(self.phases, "step", model.step, before=self.begin_step)
+        model.schedule.step = self.timed(self.phases, "agents", model.schedule.step)
+        model.datacollector.collect = self.timed(self.phases, "datacollector", model.datacollector.collect)
+        model.planner.plan = self.timed(self.phases, "planner", model.planner.plan)
+        model.rendezvous.step = self.timed(self.phases, "rendezvous", model.rendezvous.step)
+        if model.engine is not None:
+            model.engine.step = self.timed(self.phases, "engine", model.engine.step)
+
+        model.grid.move_agent = self.counted("Moves", model.grid.move_agent)
+        model.pick_up_resource = self.counted("Pickups", model.pick_up_resource)
+        model.record_delivery = self.counted("Deliveries", model.record_delivery)
+        for agent in model.schedule.agents:
+            self.instrument(agent)
+
+    def instrument(self, agent):
+        """Envolve o step e os métodos de AgentBase de um agente com medição de tempo."""
+        name = type(agent).__name__
+        agent.step = self.timed(self.classes, name, agent.step)
+        for method in AGENT_METHODS:
+            if hasattr(agent, method):
+                setattr(agent, method, self.timed(self.methods, f"{name}.{method}", getattr(agent, method)))
+
+    def timed(self, table, key, method, before=None):
+        table.setdefault(key, [0, 0.0])
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if before is not None:
+                before()
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                entry = table[key]
+                entry[0] += 1
+                entry[1] += time.perf_counter() - start
+        return wrapper
+
+    def counted(self, counter, method):
+        counters = self.counters
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            counters[counter] += 1
+            return method(*args, **kwargs)
+        return wrapper
+
+    def begin_step(self):
+        self.steps += 1
+        for counter in COUNTERS:
+            self.counters[counter] = 0
+        if self.model.engine is not None:
+            self.engine_moves = self.model.engine.moves
+
+    def reporters(self):
+        """Reporters do DataCollector com os contadores do último passo."""
+        return {
+            "Moves": lambda model: self.counters["Moves"] + (
+                model.engine.moves - self.engine_moves if model.engine is not None else 0),
+            "Pickups": lambda model: self.counters["Pickups"],
+            "Waits": lambda model: self.count_waiting(),
+            "Deliveries": lambda model: self.counters["Deliveries"]
+        }
+
+    def count_waiting(self):
+        model = self.model
+        waiting = model.schedule.get_dormant_count()
+        if model.engine is not None:
+            waiting += int(model.engine.waiting.sum())
+        return waiting
+
+    def report(self):
+        """Tempos acumulados: total, por chamada e fração do tempo de passo, por fase, classe e método."""
+        total = self.phases.get("step", [0, 0.0])[1]
+
+        def summarize(table):
+            return {
+                key: {
+                    "calls": calls,
+                    "seconds": seconds,
+                    "us_per_call": seconds / calls * 1e6 if calls else None,
+                    "share": seconds / total if total else None
+                }
+                for key, (calls, seconds) in sorted(table.items(), key=lambda item: -item[1][1])
+            }
+
+        return {"steps": self.steps, "phases": summarize(self.phases), "classes": summarize(self.classes),
+                "methods": summarize(self.methods)}
+
+    def method_totals(self):
+        """Soma, para cada método de AgentBase, as chamadas e o tempo de todas as classes."""
+        totals = {}
+        for key, (calls, seconds) in self.methods.items():
+            method = key.split(".", 1)[1]
+            entry = totals.setdefault(method, [0, 0.0])
+            entry[0] += calls
+            entry[1] += seconds
+        return totals
+
+    def format_report(self):
+        lines = [f"Perfil de {self.steps} passos"]
+        for section, title in [("phases", "Fase"), ("classes", "Classe"), ("methods", "Método")]:
+            lines.append(f"{title:<48} {'chamadas':>10} {'s':>10} {'us/chamada':>12} {'%':>6}")
+            for key, entry in self.report()[section].items():
+                share = f"{entry['share'] * 100:.1f}" if entry["share"] is not None else "-"
+                per_call = f"{entry['us_per_call']:.1f}" if entry["us_per_call"] is not None else "-"
+                lines.append(f"{key:<48} {entry['calls']:>10} {entry['seconds']:>10.3f} {per_call:>12} {share:>6}")
+        return "\n".join(lines)
@@ -0,0 +1,107 @@
+import numpy as np
+
+
+class PendingPickup:
+    """Coleta conjunta pendente: um agente esperando junto a um recurso e, se houver, o parceiro a caminho."""
+
+    __slots__ = ("resource", "waiter", "partner", "opened")
+
+    def __init__(self, resource, waiter, opened):
+        self.resource = resource
+        self.waiter = waiter
+        self.partner = None
+        self.opened = opened
+
+
+class Rendezvous:
+    """Fila, no nível do modelo, das coletas de recursos que exigem dois agentes.
+
+    Um agente que chega sozinho a um recurso desses abre um pedido e espera. A cada passo o modelo
+    recruta, para cada pedido sem parceiro, o agente ocioso mais próximo, que passa a andar até o
+    recurso. Pedidos que não se completam em `timeout` passos são abandonados: o agente que esperava
+    volta a explorar e o recrutado é liberado. Os StateAgent do motor vetorizado participam pelos seus
+    EngineAgent, como quem espera e como recrutados.
+    """
+
+    def __init__(self, model, timeout):
+        self.model = model
+        self.timeout = timeout
+        self.pending = {}
+
+    def __len__(self):
+        return len(self.pending)
+
+    def open(self, resource, waiter):
+        """Registra que waiter está esperando um parceiro para coletar resource."""
+        request = self.pending.get(resource.unique_id)
+        if request is not None:
+            return request
+        request = PendingPickup(resource, waiter, self.model.schedule.steps)
+        self.pending[resource.unique_id] = request
+        waiter.waiting = True
+        # Um agente que o planejador já mandou para o mesmo recurso é o parceiro natural
+        for claimant in self.model.planner.claims.get(resource.unique_id, ()):
+            if claimant is not waiter and claimant.rendezvous is None:
+                self.assign(request, claimant)
+                break
+        return request
+
+    def assign(self, request, partner):
+        request.partner = partner
+        partner.rendezvous = request
+
+    def close(self, resource):
+        """Encerra o pedido do recurso, coletado ou abandonado, liberando os dois agentes."""
+        request = self.pending.pop(resource.unique_id, None)
+        if request is None:
+            return
+        request.waiter.waiting = False
+        if request.partner is not None:
+            request.partner.rendezvous = None
+
+    def step(self):
+        if self.pending:
+            self.expire()
+            self.recruit()
+
+    def expire(self):
+        deadline = self.model.schedule.steps - self.timeout
+        expired = [request for request in self.pending.values() if request.opened <= deadline]
+        for request in expired:
+            self.close(request.resource)
+
+    def recruit(self):
+        """Atribui a cada pedido sem parceiro o agente ocioso mais próximo (distância de Chebyshev)."""
+        requests = [request for request in self.pending.values() if request.partner is None]
+        if not requests:
+            return
+        idle = [agent for agent in self.model.schedule.agents if self.is_idle(agent)]
+        positions = np.array([agent.pos for agent in idle], dtype=np.int64).reshape(-1, 2)
+        engine = self.model.engine
+        engine_idle = engine.idle_partners() if engine is not None else []
+        if len(engine_idle):
+            positions = np.concatenate([positions, engine.pos[engine_idle]])
+        if len(positions) == 0:
+            return
+
+        taken = np.zeros(len(positions), dtype=bool)
+        for request in requests:
+            x, y = request.resource.pos
+            distance = np.maximum(np.abs(positions[:, 0] - x), np.abs(positions[:, 1] - y))
+            distance[taken] = np.iinfo(distance.dtype).max
+            nearest = int(distance.argmin())
+            if taken[nearest]:
+                break
+            taken[nearest] = True
+            if nearest < len(idle):
+                partner = idle[nearest]
+            else:
+                partner = engine.handle(int(engine_idle[nearest - len(idle)]))
+            if getattr(partner, "target", None) is not None:
+                self.model.planner.release(partner)
+            self.assign(request, partner)
+
+    @staticmethod
+    def is_idle(agent):
+        return (agent.cooperative and agent.rendezvous is None and not agent.carrying and not agent.waiting
+                and agent.pos is not None)
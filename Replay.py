@@ -0,0 +1,226 @@
+import argparse
+import gzip
+import json
+
+from ModelBase import ModelBase
+
+
+def agent_states(model):
+    """Estado observável de cada agente: id -> (x, y, id do recurso carregado ou None, esperando)."""
+    states = {}
+    for agent in model.schedule.agents:
+        carrying = agent.carrying.unique_id if agent.carrying is not None else None
+        states[agent.unique_id] = (agent.pos[0], agent.pos[1], carrying, bool(agent.waiting))
+    engine = model.engine
+    if engine is not None:
+        for index, unique_id in enumerate(engine.unique_ids.tolist()):
+            resource = engine.carrying[index]
+            states[unique_id] = (int(engine.pos[index, 0]), int(engine.pos[index, 1]),
+                                 resource.unique_id if resource is not None else None, bool(engine.waiting[index]))
+    return states
+
+
+def initial_layout(model):
+    return {
+        "agents": sorted([unique_id, x, y] for unique_id, (x, y, _, _) in agent_states(model).items()),
+        "resources": sorted([resource.unique_id, resource.name, resource.pos[0], resource.pos[1]]
+                            for resource in model.resources.values() if not resource.carried)
+    }
+
+
+def step_delta(previous, current):
+    """Diferença compacta entre dois estados: movimentos, mudanças de carga e de espera."""
+    moves, carrying, waiting = [], [], []
+    for unique_id, state in current.items():
+        old = previous[unique_id]
+        if old[:2] != state[:2]:
+            moves.append([unique_id, state[0], state[1]])
+        if old[2] != state[2]:
+            carrying.append([unique_id, state[2]])
+        if old[3] != state[3]:
+            waiting.append([unique_id, int(state[3])])
+    return {"m": moves, "c": carrying, "w": waiting}
+
+
+class ReplayRecorder:
+    """Grava o layout inicial e as ações de cada passo de um ModelBase em um arquivo JSON Lines compactado."""
+
+    def __init__(self, model, path):
+        self.model = model
+        self.file = gzip.open(path, "wt")
+        self.state = agent_states(model)
+        header = {"params": model.params(), "layout": initial_layout(model)}
+        self.file.write(json.dumps(header, separators=(",", ":")) + "\n")
+
+    def record_step(self):
+        """Registra as ações do último passo. Deve ser chamado logo após model.step()."""
+        state = agent_states(self.model)
+        self.file.write(json.dumps(step_delta(self.state, state), separators=(",", ":")) + "\n")
+        self.state = state
+
+    def close(self):
+        self.file.close()
+
+
+class ReplayLog:
+    """Log de uma execução gravada, capaz de reexecutá-la ou de avançar até um passo sem simular os agentes."""
+
+    def __init__(self, params, layout, steps):
+        self.params = params
+        self.layout = layout
+        self.steps = steps
+
+    @classmethod
+    def load(cls, path):
+        with gzip.open(path, "rt") as replay_file:
+            header = json.loads(replay_file.readline())
+            steps = [json.loads(line) for line in replay_file]
+        return cls(header["params"], header["layout"], steps)
+
+    def build_model(self):
+        """Reconstrói o modelo no estado inicial gravado, a partir dos mesmos parâmetros e semente."""
+        model = ModelBase(**self.params)
+        if initial_layout(model) != self.layout:
+            raise ValueError("O layout inicial reconstruído difere do layout gravado.")
+        return model
+
+    def rerun(self, num_steps=None):
+        """Reexecuta a simulação e retorna o primeiro passo que diverge do log, ou None se forem idênticos."""
+        model = self.build_model()
+        state = agent_states(model)
+        for step, recorded in enumerate(self.steps[:num_steps], start=1):
+            model.step()
+            current = agent_states(model)
+            if step_delta(state, current) != recorded:
+                return step
+            state = current
+        return None
+
+    def fast_forward(self, num_steps, model=None):
+        """Aplica as ações gravadas até o passo num_steps, sem executar as decisões dos agentes.
+
+        O modelo retornado serve só para inspeção (posições, cargas, pontos e coleta de dados): o gerador
+        aleatório, os mapas de posições visitadas, os recursos conhecidos, as duplas, as coletas conjuntas
+        pendentes, os alvos do planejador e os desejos BDI continuam como no passo 0, então step() levanta
+        RuntimeError. Para continuar a simulação a partir de um passo, use um checkpoint."""
+        if self.params.get("spawn_rates"):
+            raise ValueError("O avanço sem simulação não reproduz a geração contínua de recursos; use rerun.")
+        if model is None:
+            model = self.build_model()
+        agents = {agent.unique_id: agent for agent in model.schedule.agents}
+        engine = model.engine
+        engine_index = {}
+        if engine is not None:
+            engine_index = {unique_id: index for index, unique_id in enumerate(engine.unique_ids.tolist())}
+
+        for recorded in self.steps[model.schedule.steps:num_steps]:
+            for unique_id, x, y in recorded["m"]:
+                if unique_id in agents:
+                    model.grid.move_agent(agents[unique_id], (x, y))
+                else:
+                    engine.pos[engine_index[unique_id]] = (x, y)
+            for unique_id, resource_id in recorded["c"]:
+                self.apply_carrying(model, agents.get(unique_id), engine_index.get(unique_id), resource_id)
+            for unique_id, waiting in recorded["w"]:
+                if unique_id in agents:
+                    agents[unique_id].waiting = bool(waiting)
+                else:
+                    engine.waiting[engine_index[unique_id]] = bool(waiting)
+
+            model.schedule.steps += 1
+            model.schedule.time += 1
+            finished = model.num_resources_delivered >= model.num_resources_total
+            if finished or model.schedule.steps % model.collect_every == 0:
+                model.datacollector.collect(model)
+            if finished:
+                model.running = False
+        model.step = inspect_only
+        return model
+
+    @staticmethod
+    def apply_carrying(model, agent, index, resource_id):
+        engine = model.engine
+        carrier = (agent, index)
+        carried = agent.carrying if agent is not None else engine.carrying[index]
+        if resource_id is None:
+            if carried is None:
+                return  # Já entregue pelo parceiro neste passo
+            partner = None
+            if carried.required_agents > 1:
+                partner = next((other for other in carriers(model, carried) if other != carrier), None)
+            # Quem entregou ficou na base; o parceiro, já livre, pode ter andado no mesmo passo
+            if partner is not None and carrier_pos(model, carrier) not in model.base_positions:
+                carrier, partner = partner, carrier
+            value = carried.value
+            if partner is not None:
+                share = carried.value // carried.required_agents
+                value -= share
+                set_carrying(model, partner, None, points=share)
+            set_carrying(model, carrier, None, points=value)
+            model.record_delivery(carrier_class(model, carrier), carried,
+                                  carrier_class(model, partner) if partner is not None else None,
+                                  pos=carrier_pos(model, carrier))
+            return
+
+        resource = model.resources[resource_id]
+        if not resource.carried:
+            model.pick_up_resource(resource)
+        set_carrying(model, carrier, resource)
+
+
+def inspect_only():
+    raise RuntimeError("Modelo avançado por fast_forward só serve para inspeção; "
+                       "para continuar a simulação, use um checkpoint.")
+
+
+def carriers(model, resource):
+    """Agentes que carregam o recurso, como pares (agente, None) ou (None, índice no motor vetorizado)."""
+    found = [(agent, None) for agent in model.schedule.agents if agent.carrying is resource]
+    if model.engine is not None:
+        found.extend((None, index) for index, carried in enumerate(model.engine.carrying) if carried is resource)
+    return found
+
+
+def carrier_class(model, carrier):
+    agent, index = carrier
+    return type(agent).__name__ if agent is not None else model.engine.class_name(index)
+
+
+def carrier_pos(model, carrier):
+    agent, index = carrier
+    return agent.pos if agent is not None else tuple(int(value) for value in model.engine.pos[index])
+
+
+def set_carrying(model, carrier, resource, points=0):
+    agent, index = carrier
+    if agent is not None:
+        agent.carrying = resource
+        agent.points += points
+    else:
+        model.engine.carrying[index] = resource
+        model.engine.carrying_mask[index] = resource is not None
+        model.engine.points[index] += points
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reexecuta ou avança um log de replay do ModelBase.")
+    parser.add_argument("log", help="Arquivo de replay (.jsonl.gz) gravado pelo ReplayRecorder.")
+    parser.add_argument("--fast-forward", type=int, default=None, help="Avança até o passo N sem simular os agentes, só para inspeção.")
+    args = parser.parse_args(argv)
+
+    log = ReplayLog.load(args.log)
+    if args.fast_forward is not None:
+        model = log.fast_forward(args.fast_forward)
+        print(f"Passo {model.schedule.steps}: {model.total_points} pontos, "
+              f"{model.num_resources_delivered} de {model.num_resources_total} recursos entregues.")
+        return
+
+    divergence = log.rerun()
+    if divergence is None:
+        print(f"Reexecução idêntica ao log em {len(log.steps)} passos.")
+    else:
+        print(f"Reexecução diverge do log no passo {divergence}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+class ResourceIndex:
+    """Índice espacial dos recursos não carregados, indexado pela posição no grid."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.cells = {}
+
+    def add(self, resource, pos):
+        self.cells.setdefault(pos, []).append(resource)
+
+    def remove(self, resource, pos):
+        resources = self.cells.get(pos)
+        if resources is None:
+            return
+        if resource in resources:
+            resources.remove(resource)
+        if not resources:
+            del self.cells[pos]
+
+    def at(self, pos):
+        """Retorna uma cópia da lista de recursos não carregados na posição."""
+        return list(self.cells.get(pos, ()))
+
+    def neighborhood(self, pos, radius=1, include_center=False):
+        """Retorna os recursos não carregados na vizinhança de Moore da posição."""
+        x, y = pos
+        cells = self.cells
+        found = []
+        if not cells:
+            return found
+        for dx in range(-radius, radius + 1):
+            for dy in range(-radius, radius + 1):
+                if dx == 0 and dy == 0 and not include_center:
+                    continue
+                resources = cells.get((x + dx, y + dy))
+                if resources:
+                    found.extend(resources)
+        return found
+
+    def __len__(self):
+        return sum(len(resources) for resources in self.cells.values())
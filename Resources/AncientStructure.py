@@ -1,9 +1,9 @@
 from Resources import ResourceBase
 
 class AncientStructure(ResourceBase):
-    def __init__(self, unique_id, model, name="AncientStructure"):
-        super().__init__(unique_id, model)
-        self.name = name
-        self.value = 50
-        self.required_agents = 2
-        self.color = "gold"
\ No newline at end of file
+    __slots__ = ()
+
+    name = "AncientStructure"
+    value = 50
+    required_agents = 2
+    color = "gold"
\ No newline at end of file
@@ -1,13 +1,19 @@
-from mesa import Agent
+class ResourceBase:
+    """Recurso coletável. Nome, valor, cor, forma, camada e agentes necessários são constantes de cada classe;
+    as instâncias guardam só o próprio estado, em __slots__, sem __dict__."""
 
-class ResourceBase(Agent):
-    def __init__(self, unique_id, model, name="Resource"):
-        super().__init__(unique_id, model)
-        self.name = name
-        self.value = None
-        self.carried = False
-        self.type = "Resource"
-        self.shape = "rect"
-        self.layer = 0
-        self.color = None
-        self.required_agents = 1
\ No newline at end of file
+    __slots__ = ("unique_id", "model", "pos", "carried")
+
+    name = "Resource"
+    value = None
+    type = "Resource"
+    shape = "rect"
+    layer = 0
+    color = None
+    required_agents = 1
+
+    def __init__(self, unique_id, model):
+        self.unique_id = unique_id
+        self.model = model
+        self.pos = None
+        self.carried = False
\ No newline at end of file
@@ -1,13 +1,16 @@
-from mesa.visualization.modules import CanvasGrid, ChartModule
-from mesa.visualization.ModularVisualization import ModularServer
+from mesa.visualization.modules import ChartModule
 from Captions import Captions
 
 from ModelBase import ModelBase
 from AgentPortrayal import agent_portrayal
+from DeltaCanvasGrid import DeltaCanvasGrid
+from LiveServer import LiveServer
 
 captions = Captions()
 
-grid = CanvasGrid(agent_portrayal, 15, 15, 600, 600)
+# O modelo roda sozinho em segundo plano; os navegadores recebem até N quadros por segundo
+frames_per_second = 10
+grid = DeltaCanvasGrid(agent_portrayal, 15, 15, 600, 600)
 chart = ChartModule([{"Label": "TotalPoints", "Color": "Black"}])
 
 num_agents = {
@@ -29,10 +32,11 @@ grid_params = {
 model_params = {
     "num_agents": num_agents,
     "num_resources": num_resources,
-    "grid_params" : grid_params
+    "grid_params" : grid_params,
+    "event_sink": None #O modelo roda a toda velocidade em uma thread; "print" ou um .jsonl voltam a registrar os eventos
 }
 name = "Resource Collection Model"
 
-server = ModularServer(ModelBase, [grid, chart, captions], name, model_params)
+server = LiveServer(ModelBase, [grid, chart, captions], name, model_params, frames_per_second=frames_per_second)
 server.port = 8521
 server.launch()
\ No newline at end of file
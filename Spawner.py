@@ -0,0 +1,106 @@
+import math
+from collections import deque
+
+from EventLog import SPAWN
+
+
+def poisson(rng, rate):
+    """Sorteia uma contagem de Poisson com média rate (algoritmo de Knuth, adequado para taxas pequenas)."""
+    if rate <= 0:
+        return 0
+    limit = math.exp(-rate)
+    count = 0
+    product = rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+class ResourceSpawner:
+    """Geração contínua de recursos para execuções sem fim.
+
+    A cada passo, cada classe de recurso recebe um número de recursos novos sorteado de um processo de
+    Poisson com a taxa configurada, em posições aleatórias, sem passar de limits[classe] recursos vivos
+    (no grid ou carregados). Recursos entregues voltam a um pool da classe e são reaproveitados, com um
+    novo unique_id, em vez de alocados de novo; assim a memória fica limitada pelos limites e não pela
+    duração da execução.
+    """
+
+    def __init__(self, model, rates, limits, resource_types, window=100):
+        self.model = model
+        self.rates = rates
+        self.limits = limits
+        self.resource_types = resource_types
+        self.pool = {name: [] for name in resource_types}
+        self.live = dict.fromkeys(resource_types, 0)
+        self.meter = ThroughputMeter(window)
+
+    def step(self):
+        model = self.model
+        for name, resource_class in self.resource_types.items():
+            count = min(poisson(model.random, self.rates.get(name, 0)), self.limits[name] - self.live[name])
+            for _ in range(count):
+                pool = self.pool[name]
+                resource = pool.pop() if pool else resource_class(None, model)
+                resource.unique_id = model.resource_id
+                resource.carried = False
+                model.resource_id += 1
+                pos = (model.random.randrange(model.grid.width), model.random.randrange(model.grid.height))
+                model.place_resource(resource, pos)
+                model.num_resources_total += 1
+                self.live[name] += 1
+                if model.events is not None:
+                    model.events.record(model.schedule.steps, SPAWN, resource=resource.name, pos=pos)
+
+    def recycle(self, resource):
+        """Devolve ao pool um recurso entregue. Os agentes do planejador esquecem o objeto, que vai voltar ao
+        grid como outro recurso; nos heaps BDI, as entradas antigas deixam de valer pelo unique_id."""
+        model = self.model
+        del model.resources[resource.unique_id]
+        for agent in model.planner.agents:
+            agent.forget_resource(resource)
+        self.pool[resource.name].append(resource)
+        self.live[resource.name] -= 1
+
+    def reporters(self, agent_classes):
+        """Reporters de regime permanente: médias por passo na janela do medidor."""
+        reporters = {"DeliveriesPerStep": lambda model: model.spawner.meter.deliveries_per_step()}
+        for name in agent_classes:
+            reporters[f"{name}PointsPerStep"] = lambda model, name=name: model.spawner.meter.points_per_step(name)
+        return reporters
+
+
+class ThroughputMeter:
+    """Entregas e pontos por classe de agente em cada um dos últimos window passos, com somas correntes."""
+
+    def __init__(self, window=100):
+        self.window = window
+        self.steps = deque()
+        self.delivered = 0
+        self.points = {}
+        self.delivered_sum = 0
+        self.points_sum = {}
+
+    def update(self, model):
+        """Registra o que mudou nos totais do modelo desde a última chamada; chamado uma vez por passo."""
+        points = {name: total - self.points.get(name, 0) for name, total in model.points_by_class.items()}
+        delivered = model.num_resources_delivered - self.delivered
+        self.delivered = model.num_resources_delivered
+        self.points = dict(model.points_by_class)
+
+        self.steps.append((delivered, points))
+        self.delivered_sum += delivered
+        for name, value in points.items():
+            self.points_sum[name] = self.points_sum.get(name, 0) + value
+        if len(self.steps) > self.window:
+            old_delivered, old_points = self.steps.popleft()
+            self.delivered_sum -= old_delivered
+            for name, value in old_points.items():
+                self.points_sum[name] -= value
+
+    def deliveries_per_step(self):
+        return self.delivered_sum / len(self.steps) if self.steps else 0.0
+
+    def points_per_step(self, name):
+        return self.points_sum.get(name, 0) / len(self.steps) if self.steps else 0.0
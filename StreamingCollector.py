@@ -0,0 +1,140 @@
+import csv
+import json
+import os
+import types
+from collections import deque
+from functools import partial
+
+from mesa.datacollection import DataCollector
+
+STREAM_FORMATS = ("csv", "jsonl")
+
+
+class StreamingDataCollector(DataCollector):
+    """DataCollector que grava em disco, em blocos, as linhas de modelo e de agentes de cada coleta.
+
+    Nada é acumulado em model_vars: as linhas ficam em um buffer de até chunk_size linhas e são
+    acrescentadas a `<prefixo>_model.<formato>` e `<prefixo>_agents.<formato>`. Um modelo novo começa
+    arquivos novos, truncando os de uma execução anterior com o mesmo prefixo; com resume=True (execução
+    retomada de um checkpoint) as linhas são acrescentadas aos arquivos existentes.
+    """
+
+    def __init__(self, prefix, model_reporters=None, agent_reporters=None, format="csv", chunk_size=1000,
+                 resume=False):
+        if format not in STREAM_FORMATS:
+            raise ValueError(f"Formato de coleta desconhecido: {format!r}")
+        super().__init__(model_reporters=model_reporters, agent_reporters=agent_reporters)
+        self.format = format
+        self.chunk_size = chunk_size
+        self.model_path = f"{prefix}_model.{format}"
+        self.agent_path = f"{prefix}_agents.{format}" if self.agent_reporters else None
+        self.model_columns = ["Step"] + list(self.model_reporters)
+        self.agent_columns = ["Step", "AgentID"] + list(self.agent_reporters)
+        self.model_rows = []
+        self.agent_rows = []
+        self.resume = resume
+        self.written = set()
+
+    def collect(self, model):
+        step = model.schedule.steps
+        if self.model_reporters:
+            row = [step] + [self.report(reporter, model) for reporter in self.model_reporters.values()]
+            self.model_rows.append(row)
+        if self.agent_reporters:
+            self.agent_rows.extend(self._record_agents(model))
+            if getattr(model, "engine", None) is not None:
+                self.agent_rows.extend(model.engine.agent_rows(step, self.agent_columns[2:]))
+        if len(self.model_rows) + len(self.agent_rows) >= self.chunk_size:
+            self.flush()
+
+    @staticmethod
+    def report(reporter, model):
+        """Avalia um reporter de modelo com as mesmas regras do DataCollector.collect do mesa."""
+        if isinstance(reporter, (types.LambdaType, partial)):
+            return reporter(model)
+        if isinstance(reporter, str):
+            return getattr(model, reporter, None)
+        if isinstance(reporter, list):
+            return reporter[0](*reporter[1])
+        return reporter()
+
+    def flush(self):
+        """Acrescenta as linhas em buffer aos arquivos de saída."""
+        if self.model_rows:
+            self.write_rows(self.model_path, self.model_columns, self.model_rows)
+            self.model_rows.clear()
+        if self.agent_rows:
+            self.write_rows(self.agent_path, self.agent_columns, self.agent_rows)
+            self.agent_rows.clear()
+
+    def close(self):
+        self.flush()
+
+    def write_rows(self, path, columns, rows):
+        mode = "a" if self.resume or path in self.written else "w"
+        self.written.add(path)
+        with open(path, mode, newline="") as output_file:
+            if self.format == "csv":
+                writer = csv.writer(output_file)
+                if output_file.tell() == 0:
+                    writer.writerow(columns)
+                writer.writerows(rows)
+            else:
+                output_file.writelines(json.dumps(dict(zip(columns, row))) + "\n" for row in rows)
+
+    def get_model_vars_dataframe(self):
+        """Lê de volta o arquivo de linhas de modelo (após gravar o buffer)."""
+        return self.read_dataframe(self.model_path).set_index("Step")
+
+    def get_agent_vars_dataframe(self):
+        if self.agent_path is None:
+            raise ValueError("Nenhum reporter de agente foi definido.")
+        return self.read_dataframe(self.agent_path).set_index(["Step", "AgentID"])
+
+    def read_dataframe(self, path):
+        import pandas as pd
+
+        self.flush()
+        if self.format == "csv":
+            return pd.read_csv(path)
+        return pd.read_json(path, lines=True)
+
+
+class WindowDataCollector(DataCollector):
+    """DataCollector em memória que guarda só as últimas window coletas de modelo.
+
+    Para execuções sem fim (geração contínua de recursos), em que o DataCollector do mesa cresceria uma
+    linha por coleta para sempre. Cada coluna de model_vars é um deque limitado, e a coluna Step guarda o
+    passo de cada linha, usado como índice do DataFrame.
+    """
+
+    def __init__(self, model_reporters=None, window=10000):
+        super().__init__(model_reporters={"Step": lambda model: model.schedule.steps, **(model_reporters or {})})
+        self.window = window
+        self.model_vars = {name: deque(maxlen=window) for name in self.model_vars}
+
+    def get_model_vars_dataframe(self):
+        import pandas as pd
+
+        return pd.DataFrame({name: list(values) for name, values in self.model_vars.items()}).set_index("Step")
+
+
+def make_collector(spec, model_reporters, agent_reporters=None, chunk_size=1000, resume=False, window=None):
+    """Cria o coletor do modelo a partir de uma especificação simples.
+
+    None mantém o DataCollector em memória do mesa (só reporters de modelo, como antes), ou um
+    WindowDataCollector com as últimas window coletas quando window é dado; um caminho
+    terminado em .csv ou .jsonl ativa a gravação em disco com esse prefixo e formato, continuando os
+    arquivos existentes só com resume=True; uma instância de DataCollector é usada como está.
+    """
+    if spec is None:
+        if window is not None:
+            return WindowDataCollector(model_reporters, window)
+        return DataCollector(model_reporters=model_reporters)
+    if isinstance(spec, DataCollector):
+        return spec
+    prefix, extension = os.path.splitext(spec)
+    if extension.lstrip(".") not in STREAM_FORMATS:
+        raise ValueError(f"Coletor desconhecido: {spec!r} (use um caminho .csv ou .jsonl)")
+    return StreamingDataCollector(prefix, model_reporters, agent_reporters, format=extension.lstrip("."),
+                                  chunk_size=chunk_size, resume=resume)
@@ -0,0 +1,292 @@
+import argparse
+import os
+import random
+import time
+from multiprocessing import Pipe, Process
+from multiprocessing.shared_memory import SharedMemory
+from types import SimpleNamespace
+
+import numpy as np
+from mesa import Model
+from mesa.time import BaseScheduler
+
+from ModelBase import ModelBase, AGENT_CLASSES, RESOURCE_CLASSES, RESOURCE_TYPES, totals_reporters
+from Planner import base_field
+from Rendezvous import Rendezvous
+from ResourceIndex import ResourceIndex
+from StreamingCollector import make_collector
+from VectorEngine import VectorEngine, VECTOR_AGENT_CLASSES
+
+
+def tile_of(edges, x):
+    """Índice da faixa de colunas que contém cada x."""
+    return np.searchsorted(edges, x, side="right") - 1
+
+
+def attach_counts(shared, size):
+    return [np.ndarray((size,), dtype=np.int32, buffer=memory.buf) for memory in shared]
+
+
+class TileModel:
+    """Modelo mínimo visto pelo VectorEngine de uma faixa: só os recursos da faixa e os totais dela.
+
+    As contagens de recursos por célula são as do grid inteiro, em memória compartilhada entre as faixas,
+    mas cada faixa só lê as das próprias colunas: a coleta é restrita a owned e não há agentes BDI para
+    consultar a vizinhança. A memória compartilhada apenas evita uma cópia das contagens por processo.
+    """
+
+    record_delivery = ModelBase.record_delivery
+
+    def __init__(self, grid_params, seed, base_positions, timeout, resources):
+        self.grid = SimpleNamespace(width=grid_params["width"], height=grid_params["height"])
+        self.random = random.Random(seed)
+        self.base_positions = base_positions
+        self.base_lookup, _ = base_field(self.grid.width, self.grid.height, base_positions)
+        self.schedule = SimpleNamespace(steps=0, agents=[])
+        self.planner = SimpleNamespace(claims={})
+        self.rendezvous = Rendezvous(self, timeout)
+        self.events = None
+        self.bdi_agents = []
+        self.engine = None
+        self.spawner = None
+        self.resource_index = ResourceIndex(self.grid.width, self.grid.height)
+        for unique_id, name, pos in resources:
+            resource = RESOURCE_TYPES[name](unique_id, self)
+            resource.pos = pos
+            self.resource_index.add(resource, pos)
+
+        self.num_resources_delivered = 0
+        self.total_points = 0
+        self.points_by_class = dict.fromkeys(AGENT_CLASSES, 0)
+        self.points_by_resource = dict.fromkeys(RESOURCE_CLASSES, 0)
+        self.delivered_by_resource = dict.fromkeys(RESOURCE_CLASSES, 0)
+        self.delivered_by_base = [0] * len(base_positions)
+
+    def pick_up_resource(self, resource):
+        resource.carried = True
+        self.rendezvous.close(resource)
+        self.resource_index.remove(resource, resource.pos)
+        self.engine.resource_removed(resource, resource.pos)
+
+    def totals(self):
+        return (self.num_resources_delivered, self.total_points, self.points_by_class, self.points_by_resource,
+                self.delivered_by_resource, self.delivered_by_base, self.engine.num_agents)
+
+
+def hand_off(engine, edges, tile):
+    """Retira do motor os agentes que saíram da faixa, agrupados pela faixa de destino."""
+    emigrants = {}
+    while True:
+        owner = tile_of(edges, engine.pos[:, 0])
+        leaving = owner != tile
+        if not leaving.any():
+            return emigrants
+        destination = int(owner[leaving][0])
+        emigrants[destination] = engine.take_agents(np.flatnonzero(owner == destination))
+
+
+def run_tile(connection, tile, edges, grid_params, seed, base_positions, timeout, resources, agents, shared_names):
+    """Laço de um processo de faixa: adota os agentes que chegaram, executa um passo e devolve os que saíram."""
+    shared = [SharedMemory(name=name) for name in shared_names]
+    model = TileModel(grid_params, seed, base_positions, timeout, resources)
+    engine = VectorEngine(model, {}, 1, [])
+    engine.resource_count, engine.crystal_count = attach_counts(shared, model.grid.width * model.grid.height)
+    engine.owned = (int(edges[tile]), int(edges[tile + 1]))
+    model.engine = engine
+    engine.add_agents(agents)
+    try:
+        while True:
+            immigrants = connection.recv()
+            if immigrants is None:
+                break
+            for batch in immigrants:
+                engine.add_agents(batch)
+            model.rendezvous.step()
+            engine.step()
+            model.schedule.steps += 1
+            connection.send((hand_off(engine, edges, tile), model.totals()))
+    finally:
+        del engine.resource_count, engine.crystal_count
+        for memory in shared:
+            memory.close()
+        connection.close()
+
+
+class TiledModel(Model):
+    """Executa um único ModelBase grande dividido em faixas de colunas, uma por processo.
+
+    O modelo é montado como de costume (engine="vector") e depois repartido: cada processo recebe os
+    agentes e os recursos de uma faixa e avança em sincronia com os demais. As contagens de recursos
+    por célula ficam em memória compartilhada; a cada passo só trafegam os agentes que cruzaram uma
+    borda, com os blocos já alocados dos seus mapas de posições visitadas, e os totais de cada faixa, que
+    são somados aqui e coletados em um único DataCollector.
+
+    Só SimpleAgent e StateAgent, os agentes do motor vetorizado, podem ser executados assim.
+    """
+
+    def __init__(self, num_agents, num_resources, grid_params, seed=None, tiles=None, collector=None,
+                 collect_every=1, rendezvous_timeout=None):
+        super().__init__()
+        unsupported = [name for name in AGENT_CLASSES if name not in VECTOR_AGENT_CLASSES and num_agents.get(name)]
+        if unsupported:
+            raise ValueError(f"A execução em faixas só suporta {', '.join(VECTOR_AGENT_CLASSES)}; "
+                             f"remova {', '.join(unsupported)}.")
+        layout = ModelBase(num_agents, num_resources, grid_params, seed=seed, engine="vector",
+                           rendezvous_timeout=rendezvous_timeout)
+        self.num_agents = num_agents
+        self.num_resources = num_resources
+        self.grid_params = grid_params
+        self.seed = layout._seed
+        self.rendezvous_timeout = layout.rendezvous.timeout
+        self.collect_every = collect_every
+        width = grid_params["width"]
+        if tiles is None:
+            tiles = os.cpu_count() or 1
+        self.tiles = max(1, min(tiles, width))
+        self.edges = np.linspace(0, width, self.tiles + 1).astype(int)
+
+        engine = layout.engine
+        self.shared = []
+        for counts in (engine.resource_count, engine.crystal_count):
+            memory = SharedMemory(create=True, size=counts.nbytes)
+            np.ndarray(counts.shape, dtype=counts.dtype, buffer=memory.buf)[:] = counts
+            self.shared.append(memory)
+
+        resources = [[] for _ in range(self.tiles)]
+        for resource in layout.resources.values():
+            resources[int(tile_of(self.edges, resource.pos[0]))].append(
+                (resource.unique_id, type(resource).__name__, resource.pos))
+
+        self.connections = []
+        self.workers = []
+        for tile in range(self.tiles):
+            agents = engine.take_agents(np.flatnonzero(tile_of(self.edges, engine.pos[:, 0]) == tile))
+            parent, child = Pipe()
+            worker = Process(target=run_tile, daemon=True,
+                             args=(child, tile, self.edges, grid_params, layout.random.getrandbits(64),
+                                   layout.base_positions, self.rendezvous_timeout, resources[tile], agents,
+                                   [memory.name for memory in self.shared]))
+            worker.start()
+            child.close()
+            self.connections.append(parent)
+            self.workers.append(worker)
+        self.immigrants = [[] for _ in range(self.tiles)]
+
+        self.schedule = BaseScheduler(self)
+        self.running = True
+        self.num_resources_total = layout.num_resources_total
+        self.num_resources_delivered = 0
+        self.total_points = 0
+        self.points_by_class = dict.fromkeys(AGENT_CLASSES, 0)
+        self.points_by_resource = dict.fromkeys(RESOURCE_CLASSES, 0)
+        self.delivered_by_resource = dict.fromkeys(RESOURCE_CLASSES, 0)
+        self.delivered_by_base = [0] * len(layout.bases)
+        self.agents_per_tile = [0] * self.tiles
+        self.datacollector = make_collector(collector, totals_reporters(len(layout.bases)))
+
+    def params(self):
+        return {
+            "num_agents": self.num_agents,
+            "num_resources": self.num_resources,
+            "grid_params": self.grid_params,
+            "seed": self.seed,
+            "tiles": self.tiles,
+            "rendezvous_timeout": self.rendezvous_timeout
+        }
+
+    def step(self):
+        for connection, immigrants in zip(self.connections, self.immigrants):
+            connection.send(immigrants)
+        self.immigrants = [[] for _ in range(self.tiles)]
+        totals = []
+        for connection in self.connections:
+            emigrants, tile_totals = connection.recv()
+            for destination, batch in emigrants.items():
+                self.immigrants[destination].append(batch)
+            totals.append(tile_totals)
+        self.merge_totals(totals)
+        self.schedule.step()
+
+        finished = self.num_resources_delivered >= self.num_resources_total
+        if finished or self.schedule.steps % self.collect_every == 0:
+            self.datacollector.collect(self)
+        if finished:
+            self.running = False
+            self.flush()
+
+    def merge_totals(self, totals):
+        """Soma os totais acumulados de cada faixa."""
+        self.num_resources_delivered = sum(tile[0] for tile in totals)
+        self.total_points = sum(tile[1] for tile in totals)
+        for name in self.points_by_class:
+            self.points_by_class[name] = sum(tile[2][name] for tile in totals)
+        for name in RESOURCE_CLASSES:
+            self.points_by_resource[name] = sum(tile[3][name] for tile in totals)
+            self.delivered_by_resource[name] = sum(tile[4][name] for tile in totals)
+        self.delivered_by_base = [sum(counts) for counts in zip(*(tile[5] for tile in totals))]
+        self.agents_per_tile = [tile[6] + sum(len(batch["kind"]) for batch in immigrants)
+                                for tile, immigrants in zip(totals, self.immigrants)]
+
+    def flush(self):
+        if hasattr(self.datacollector, "flush"):
+            self.datacollector.flush()
+
+    def close(self):
+        """Encerra os processos das faixas e libera a memória compartilhada."""
+        for connection in self.connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in self.workers:
+            worker.join()
+        for connection in self.connections:
+            connection.close()
+        for memory in self.shared:
+            memory.close()
+            memory.unlink()
+        self.connections = []
+        self.workers = []
+        self.shared = []
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Executa um ModelBase grande dividido em faixas, uma por processo.")
+    parser.add_argument("--width", type=int, default=1000)
+    parser.add_argument("--height", type=int, default=1000)
+    parser.add_argument("--simple-agents", type=int, default=0)
+    parser.add_argument("--state-agents", type=int, default=1000)
+    parser.add_argument("--resources", type=int, default=500, help="Recursos de cada tipo.")
+    parser.add_argument("--tiles", type=int, default=None, help="Número de faixas (padrão: número de CPUs).")
+    parser.add_argument("--max-steps", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--collector", default=None, help="Caminho .csv ou .jsonl para gravar a coleta em disco.")
+    parser.add_argument("--collect-every", type=int, default=1, help="Coleta a cada N passos.")
+    args = parser.parse_args(argv)
+
+    num_agents = dict.fromkeys(AGENT_CLASSES, 0)
+    num_agents.update(SimpleAgent=args.simple_agents, StateAgent=args.state_agents)
+    num_resources = dict.fromkeys(RESOURCE_CLASSES, args.resources)
+    grid_params = {"width": args.width, "height": args.height}
+
+    with TiledModel(num_agents, num_resources, grid_params, seed=args.seed, tiles=args.tiles,
+                    collector=args.collector, collect_every=args.collect_every) as model:
+        start = time.perf_counter()
+        while model.running and model.schedule.steps < args.max_steps:
+            model.step()
+        seconds = time.perf_counter() - start
+        print(f"{model.tiles} faixas, {model.schedule.steps} passos em {seconds:.1f}s "
+              f"({model.schedule.steps / seconds:.1f} passos/s); agentes por faixa: {model.agents_per_tile}")
+        print(f"{model.total_points} pontos, {model.num_resources_delivered} de {model.num_resources_total} "
+              f"recursos entregues.")
+
+
+if __name__ == "__main__":
+    main()
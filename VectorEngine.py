@@ -0,0 +1,496 @@
+import itertools
+
+import numpy as np
+
+from EventLog import PICKUP, WAIT, DELIVER
+import Resources
+from Resources import EnergeticCrystal
+from VisitedMap import VisitedBlocks
+
+VECTOR_AGENT_CLASSES = ("SimpleAgent", "StateAgent")
+SIMPLE = 0
+STATE = 1
+
+VON_NEUMANN = np.array([(0, -1), (0, 1), (-1, 0), (1, 0)])
+MOORE = np.array([(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0)])
+
+
+class EngineAgent:
+    """Representante de um StateAgent do motor vetorizado nas coletas conjuntas.
+
+    A fila de coletas conjuntas do modelo e os agentes do schedule enxergam o agente vetorizado por este
+    objeto, com os atributos de AgentBase que eles usam, lidos e gravados nos arrays do motor. Há um só
+    representante por agente, criado na primeira coleta conjunta de que ele participa.
+    """
+
+    __slots__ = ("engine", "index")
+
+    cooperative = True
+
+    def __init__(self, engine, index):
+        self.engine = engine
+        self.index = index
+
+    @property
+    def unique_id(self):
+        return int(self.engine.unique_ids[self.index])
+
+    @property
+    def name(self):
+        return self.engine.names[self.index]
+
+    @property
+    def class_name(self):
+        return self.engine.class_name(self.index)
+
+    @property
+    def pos(self):
+        return tuple(int(value) for value in self.engine.pos[self.index])
+
+    @property
+    def carrying(self):
+        return self.engine.carrying[self.index]
+
+    @carrying.setter
+    def carrying(self, resource):
+        self.engine.carrying[self.index] = resource
+        self.engine.carrying_mask[self.index] = resource is not None
+
+    @property
+    def waiting(self):
+        return bool(self.engine.waiting[self.index])
+
+    @waiting.setter
+    def waiting(self, value):
+        self.engine.waiting[self.index] = value
+
+    @property
+    def partner(self):
+        partner = int(self.engine.partner[self.index])
+        return self.engine.handle(partner) if partner >= 0 else self.engine.outside_partner[self.index]
+
+    @partner.setter
+    def partner(self, other):
+        if isinstance(other, EngineAgent):
+            self.engine.partner[self.index] = other.index
+            self.engine.outside_partner[self.index] = None
+        else:
+            self.engine.partner[self.index] = -1
+            self.engine.outside_partner[self.index] = other
+
+    @property
+    def rendezvous(self):
+        """Coleta conjunta para a qual o agente foi recrutado; o motor o leva até o recurso."""
+        return self.engine.rendezvous[self.index]
+
+    @rendezvous.setter
+    def rendezvous(self, request):
+        self.engine.rendezvous[self.index] = request
+        self.engine.goal[self.index] = request.resource.pos if request is not None else (-1, -1)
+
+    @property
+    def points(self):
+        return int(self.engine.points[self.index])
+
+    @points.setter
+    def points(self, value):
+        self.engine.points[self.index] = value
+
+    def forget_resource(self, resource):
+        pass
+
+
+class VectorEngine:
+    """Avança em lote, com arrays NumPy, todos os SimpleAgent e StateAgent de um ModelBase.
+
+    Os agentes vetorizados não são objetos mesa: não ficam no grid nem no schedule. Eles compartilham
+    com os demais agentes os recursos, o índice de recursos, o quadro de crenças BDI, os contadores e a
+    fila de coletas conjuntas do modelo: um StateAgent vetorizado espera, é recrutado e forma dupla com
+    agentes do schedule como se fosse um deles, por meio do seu EngineAgent.
+    """
+
+    def __init__(self, model, num_agents, first_id, positions):
+        self.model = model
+        self.width = model.grid.width
+        self.height = model.grid.height
+        self.rng = np.random.default_rng(model.random.getrandbits(64))
+        self.base_positions = np.array(model.base_positions, dtype=np.int64)
+
+        kinds = [SIMPLE] * num_agents.get("SimpleAgent", 0) + [STATE] * num_agents.get("StateAgent", 0)
+        self.num_agents = len(kinds)
+        self.kind = np.array(kinds, dtype=np.int8)
+        self.unique_ids = np.arange(first_id, first_id + self.num_agents)
+        self.names = [f"{VECTOR_AGENT_CLASSES[kind]}_{unique_id}" for kind, unique_id in zip(kinds, self.unique_ids)]
+
+        self.pos = np.array(positions, dtype=np.int64).reshape(self.num_agents, 2)
+
+        self.carrying = np.full(self.num_agents, None, dtype=object)
+        self.carrying_mask = np.zeros(self.num_agents, dtype=bool)
+        self.waiting = np.zeros(self.num_agents, dtype=bool)
+        # Parceiro de coleta conjunta: índice no motor ou, se for um agente do schedule, o próprio agente
+        self.partner = np.full(self.num_agents, -1, dtype=np.int64)
+        self.outside_partner = np.full(self.num_agents, None, dtype=object)
+        # Coleta conjunta para a qual o StateAgent foi recrutado e a célula do recurso dela
+        self.rendezvous = np.full(self.num_agents, None, dtype=object)
+        self.goal = np.full((self.num_agents, 2), -1, dtype=np.int64)
+        self.handles = {}
+        self.points = np.zeros(self.num_agents, dtype=np.int64)
+        self.moves = 0
+
+        # Mapas de posições visitadas dos StateAgent: um bit por célula, só nos blocos de 32x32 já percorridos
+        self.visited = VisitedBlocks(self.width, self.height)
+
+        # Quantidade de recursos não carregados por célula, mantida pelo ModelBase
+        self.resource_count = np.zeros(self.width * self.height, dtype=np.int32)
+        self.crystal_count = np.zeros(self.width * self.height, dtype=np.int32)
+        # Faixa de colunas [x0, x1) cujos recursos este motor pode coletar; None quando o grid é todo dele
+        self.owned = None
+
+    def resource_placed(self, resource, pos):
+        cell = pos[0] * self.height + pos[1]
+        self.resource_count[cell] += 1
+        if isinstance(resource, EnergeticCrystal):
+            self.crystal_count[cell] += 1
+
+    def resource_removed(self, resource, pos):
+        cell = pos[0] * self.height + pos[1]
+        self.resource_count[cell] -= 1
+        if isinstance(resource, EnergeticCrystal):
+            self.crystal_count[cell] -= 1
+
+    def step(self):
+        """Executa um passo de todos os agentes vetorizados."""
+        if self.num_agents == 0:
+            return
+        carrying = self.carrying_mask.copy()
+        active = ~self.waiting
+
+        state_active = np.flatnonzero(active & (self.kind == STATE))
+        self._mark_visited(state_active, self.pos[state_active])
+
+        self._return_to_base(np.flatnonzero(carrying))
+
+        free = active & ~carrying
+        heading = free & (self.goal[:, 0] >= 0)
+        simple_free = np.flatnonzero(free & ~heading & (self.kind == SIMPLE))
+        state_free = np.flatnonzero(free & ~heading & (self.kind == STATE))
+        self._random_move(simple_free)
+        self._random_move_to_unvisited(state_free)
+        arrived = self._move_to_goal(np.flatnonzero(heading))
+        self._collect(simple_free, np.concatenate([state_free, arrived]))
+
+        if self.model.bdi_agents:
+            watchers = np.flatnonzero((self.kind == SIMPLE) | (free & (self.kind == STATE)))
+            self._check_resources(watchers)
+
+    def handle(self, agent):
+        """O EngineAgent do agente de índice agent."""
+        handle = self.handles.get(agent)
+        if handle is None:
+            handle = self.handles[agent] = EngineAgent(self, agent)
+        return handle
+
+    def handle_by_id(self, unique_id):
+        matches = np.flatnonzero(self.unique_ids == unique_id)
+        return self.handle(int(matches[0])) if len(matches) else None
+
+    def idle_partners(self):
+        """Índices dos StateAgent que podem ser recrutados para uma coleta conjunta."""
+        return np.flatnonzero((self.kind == STATE) & ~self.waiting & ~self.carrying_mask & (self.goal[:, 0] < 0))
+
+    def agents_at(self, pos):
+        """EngineAgents dos StateAgent sem carga na célula, que podem formar dupla com um agente do schedule."""
+        here = np.flatnonzero((self.kind == STATE) & ~self.carrying_mask &
+                              (self.pos[:, 0] == pos[0]) & (self.pos[:, 1] == pos[1]))
+        return [self.handle(int(agent)) for agent in here]
+
+    def _cells(self, positions):
+        return positions[..., 0] * self.height + positions[..., 1]
+
+    def _mark_visited(self, agents, positions):
+        self.visited.mark(self.unique_ids[agents], positions[:, 0], positions[:, 1])
+
+    def _is_visited(self, agents, positions):
+        return self.visited.contains(self.unique_ids[agents][:, None], positions[..., 0], positions[..., 1])
+
+    def _neighbours(self, agents, offsets):
+        neighbours = self.pos[agents][:, None, :] + offsets[None, :, :]
+        valid = ((neighbours[..., 0] >= 0) & (neighbours[..., 0] < self.width) &
+                 (neighbours[..., 1] >= 0) & (neighbours[..., 1] < self.height))
+        return neighbours, valid
+
+    def _choose(self, agents, neighbours, mask):
+        """Move cada agente para um vizinho sorteado uniformemente entre os permitidos pela máscara."""
+        scores = self.rng.random(mask.shape)
+        scores[~mask] = -1.0
+        choice = scores.argmax(axis=1)
+        can_move = mask.any(axis=1)
+        moved = agents[can_move]
+        self.pos[moved] = neighbours[can_move, choice[can_move]]
+        self.moves += len(moved)
+        return can_move
+
+    def _random_move(self, agents):
+        if len(agents) == 0:
+            return
+        neighbours, valid = self._neighbours(agents, VON_NEUMANN)
+        self._choose(agents, neighbours, valid)
+
+    def _random_move_to_unvisited(self, agents):
+        if len(agents) == 0:
+            return
+        neighbours, valid = self._neighbours(agents, MOORE)
+        unvisited = valid & ~self._is_visited(agents, np.where(valid[..., None], neighbours, 0))
+        use_unvisited = unvisited.any(axis=1)
+        self._choose(agents, neighbours, np.where(use_unvisited[:, None], unvisited, valid))
+        explored = agents[use_unvisited]
+        self._mark_visited(explored, self.pos[explored])
+
+    def _return_to_base(self, agents):
+        if len(agents) == 0:
+            return
+        positions = self.pos[agents]
+        bases = self.base_positions[self.model.base_lookup[positions[:, 0], positions[:, 1]]]
+        steps = np.sign(bases - positions)
+        self.pos[agents] += steps
+        self.moves += int(steps.any(axis=1).sum())
+        for agent in agents[(self.pos[agents] == bases).all(axis=1)]:
+            self._deliver(agent)
+
+    def _move_to_goal(self, agents):
+        """Leva os agentes recrutados um passo em direção ao recurso da coleta conjunta; retorna os que estão
+        nele. Eles tentam a coleta a cada passo, até a fila do modelo encerrar o pedido."""
+        if len(agents) == 0:
+            return agents
+        steps = np.sign(self.goal[agents] - self.pos[agents])
+        self.pos[agents] += steps
+        self.moves += int(steps.any(axis=1).sum())
+        return agents[(self.pos[agents] == self.goal[agents]).all(axis=1)]
+
+    def _collect(self, simple_agents, state_agents):
+        simple_agents = simple_agents[self.crystal_count[self._cells(self.pos[simple_agents])] > 0]
+        state_agents = state_agents[self.resource_count[self._cells(self.pos[state_agents])] > 0]
+        candidates = np.concatenate([simple_agents, state_agents])
+        if self.owned is not None:
+            x = self.pos[candidates, 0]
+            candidates = candidates[(x >= self.owned[0]) & (x < self.owned[1])]
+        if len(candidates) == 0:
+            return
+
+        index = self.model.resource_index
+        for agent in self.rng.permutation(candidates):
+            pos = tuple(int(value) for value in self.pos[agent])
+            resources = index.at(pos)
+            if self.kind[agent] == SIMPLE:
+                resources = [resource for resource in resources if isinstance(resource, EnergeticCrystal)]
+                if resources:
+                    self._pick_up(agent, resources[0])
+                continue
+
+            pending = self.model.rendezvous.pending
+            blocked = None
+            for resource in resources:
+                if resource.required_agents == 1:
+                    self._pick_up(agent, resource)
+                    break
+                # Quem espera junto ao recurso, do motor ou do schedule, forma a dupla
+                request = pending.get(resource.unique_id)
+                if request is not None and request.waiter is not self.handles.get(agent):
+                    self._pick_up(agent, resource, partner=request.waiter)
+                    break
+                blocked = blocked or resource
+            else:
+                if blocked is not None:
+                    events = self.model.events
+                    if events is not None:
+                        events.record(self.model.schedule.steps, WAIT, int(self.unique_ids[agent]),
+                                      agent=self.names[agent], resource=blocked.name, pos=pos)
+                    self.model.rendezvous.open(blocked, self.handle(agent))
+
+    def _pick_up(self, agent, resource, partner=None):
+        """Coleta o recurso; partner, um EngineAgent ou um agente do schedule, o coleta junto."""
+        events = self.model.events
+        if events is not None:
+            events.record(self.model.schedule.steps, PICKUP, int(self.unique_ids[agent]), agent=self.names[agent],
+                          resource=resource.name, partner=partner.name if partner is not None else None)
+        self.model.pick_up_resource(resource)
+        if partner is None:
+            self.carrying[agent] = resource
+            self.carrying_mask[agent] = True
+            return
+        handle = self.handle(agent)
+        for member, other in ((handle, partner), (partner, handle)):
+            member.carrying = resource
+            member.partner = other
+            member.waiting = False
+
+    def _deliver(self, agent):
+        """Entrega o recurso do agente; um recurso coletado em dupla é entregue uma vez, com o valor dividido."""
+        resource = self.carrying[agent]
+        if resource is None:
+            return
+        partner = int(self.partner[agent])
+        outside = self.outside_partner[agent]
+        value = resource.value
+        if partner >= 0:
+            share = resource.value // resource.required_agents
+            value -= share
+            self.points[partner] += share
+            self.carrying[partner] = None
+            self.carrying_mask[partner] = False
+            self.partner[[agent, partner]] = -1
+            partner_name, partner_class = self.names[partner], self.class_name(partner)
+        elif outside is not None:
+            share = resource.value // resource.required_agents
+            value -= share
+            outside.points += share
+            outside.forget_resource(resource)
+            outside.carrying = None
+            outside.partner = None
+            self.outside_partner[agent] = None
+            partner_name, partner_class = outside.name, outside.class_name
+        else:
+            partner_name = partner_class = None
+        self.points[agent] += value
+        events = self.model.events
+        if events is not None:
+            events.record(self.model.schedule.steps, DELIVER, int(self.unique_ids[agent]), agent=self.names[agent],
+                          resource=resource.name, value=value, partner=partner_name)
+        self.model.record_delivery(self.class_name(agent), resource, partner_class,
+                                   pos=tuple(int(value) for value in self.pos[agent]))
+        self.carrying[agent] = None
+        self.carrying_mask[agent] = False
+
+    def take_agents(self, agents):
+        """Remove os agentes indicados e retorna o estado deles em tipos simples, para outro motor adotá-los.
+        Parceiros de coleta conjunta devem sair juntos."""
+        agents = np.asarray(agents, dtype=np.int64)
+        self._leave_rendezvous(agents)
+        partners = self.partner[agents]
+        batch = {
+            "kind": self.kind[agents],
+            "unique_ids": self.unique_ids[agents],
+            "pos": self.pos[agents],
+            "carrying": [(resource.unique_id, type(resource).__name__) if resource is not None else None
+                         for resource in self.carrying[agents]],
+            "partner": np.where(partners >= 0, self.unique_ids[partners], -1),
+            "points": self.points[agents],
+            "visited": self.visited.take(self.unique_ids[agents[self.kind[agents] == STATE]])
+        }
+        keep = np.ones(self.num_agents, dtype=bool)
+        keep[agents] = False
+        self._keep(keep)
+        return batch
+
+    def add_agents(self, batch):
+        """Adota agentes retirados de outro motor por take_agents."""
+        count = len(batch["kind"])
+        if count == 0:
+            return
+        first = self.num_agents
+        carrying = np.full(count, None, dtype=object)
+        for index, carried in enumerate(batch["carrying"]):
+            if carried is not None:
+                unique_id, name = carried
+                resource = getattr(Resources, name)(unique_id, self.model)
+                resource.carried = True
+                carrying[index] = resource
+
+        index_of = {unique_id: first + index for index, unique_id in enumerate(batch["unique_ids"].tolist())}
+        partner = np.array([index_of.get(unique_id, -1) for unique_id in batch["partner"].tolist()], dtype=np.int64)
+
+        self.kind = np.concatenate([self.kind, batch["kind"]])
+        self.unique_ids = np.concatenate([self.unique_ids, batch["unique_ids"]])
+        self.names.extend(f"{VECTOR_AGENT_CLASSES[kind]}_{unique_id}"
+                          for kind, unique_id in zip(batch["kind"].tolist(), batch["unique_ids"].tolist()))
+        self.pos = np.concatenate([self.pos, batch["pos"]])
+        self.carrying = np.concatenate([self.carrying, carrying])
+        self.carrying_mask = np.concatenate([self.carrying_mask, carrying != None])
+        self.waiting = np.concatenate([self.waiting, np.zeros(count, dtype=bool)])
+        self.partner = np.concatenate([self.partner, partner])
+        self.outside_partner = np.concatenate([self.outside_partner, np.full(count, None, dtype=object)])
+        self.rendezvous = np.concatenate([self.rendezvous, np.full(count, None, dtype=object)])
+        self.goal = np.concatenate([self.goal, np.full((count, 2), -1, dtype=np.int64)])
+        self.points = np.concatenate([self.points, batch["points"]])
+        self.visited.put(*batch["visited"])
+        self.num_agents += count
+
+    def _leave_rendezvous(self, agents):
+        """Tira os agentes que vão sair do motor das coletas conjuntas pendentes: o recrutado é liberado e o
+        pedido de quem esperava é encerrado."""
+        for agent in agents.tolist():
+            handle = self.handles.get(agent)
+            if handle is None:
+                continue
+            request = self.rendezvous[agent]
+            if request is not None and request.partner is handle:
+                request.partner = None
+                handle.rendezvous = None
+            for request in list(self.model.rendezvous.pending.values()):
+                if request.waiter is handle:
+                    self.model.rendezvous.close(request.resource)
+
+    def _keep(self, keep):
+        """Descarta os agentes fora da máscara, renumerando os índices guardados em parceiros e representantes."""
+        new_index = np.cumsum(keep) - 1
+
+        partner = self.partner[keep]
+        linked = partner >= 0
+        partner[linked] = np.where(keep[partner[linked]], new_index[partner[linked]], -1)
+        self.partner = partner
+
+        handles = {}
+        for agent, handle in self.handles.items():
+            if keep[agent]:
+                handle.index = int(new_index[agent])
+                handles[handle.index] = handle
+        self.handles = handles
+
+        self.kind = self.kind[keep]
+        self.unique_ids = self.unique_ids[keep]
+        self.names = [name for name, kept in zip(self.names, keep.tolist()) if kept]
+        self.pos = self.pos[keep]
+        self.carrying = self.carrying[keep]
+        self.carrying_mask = self.carrying_mask[keep]
+        self.waiting = self.waiting[keep]
+        self.outside_partner = self.outside_partner[keep]
+        self.rendezvous = self.rendezvous[keep]
+        self.goal = self.goal[keep]
+        self.points = self.points[keep]
+        self.num_agents = int(keep.sum())
+
+    def class_name(self, agent):
+        return VECTOR_AGENT_CLASSES[self.kind[agent]]
+
+    def _check_resources(self, agents):
+        """Informa ao quadro de crenças BDI os recursos na vizinhança dos agentes."""
+        if len(agents) == 0:
+            return
+        neighbours, valid = self._neighbours(agents, MOORE)
+        cells = np.where(valid, self._cells(neighbours), 0)
+        seen = np.unique(cells[valid & (self.resource_count[cells] > 0)])
+        for cell in seen:
+            for resource in self.model.resource_index.at((int(cell) // self.height, int(cell) % self.height)):
+                self.model.blackboard.add(resource)
+
+    def visited_nbytes(self):
+        """Bytes do mapa de posições visitadas de cada agente vetorizado (zero para SimpleAgent)."""
+        return self.visited.nbytes(self.unique_ids).tolist()
+
+    def agent_points(self):
+        """Retorna (nome, id, pontos) de cada agente vetorizado."""
+        return [(name, int(unique_id), int(points))
+                for name, unique_id, points in zip(self.names, self.unique_ids, self.points)]
+
+    def agent_rows(self, step, columns):
+        """Linhas (passo, id, *colunas) do coletor para os agentes vetorizados; colunas desconhecidas ficam vazias."""
+        values = {
+            "Class": [VECTOR_AGENT_CLASSES[kind] for kind in self.kind.tolist()],
+            "X": self.pos[:, 0].tolist(),
+            "Y": self.pos[:, 1].tolist(),
+            "Points": self.points.tolist(),
+            "Carrying": [resource.unique_id if resource is not None else None for resource in self.carrying],
+            "Waiting": self.waiting.tolist()
+        }
+        empty = [None] * self.num_agents
+        return zip(itertools.repeat(step), self.unique_ids.tolist(), *(values.get(column, empty) for column in columns))
@@ -0,0 +1,161 @@
+import sys
+
+import numpy as np
+
+CHUNK_BITS = 5 #Blocos de 32x32 células
+CHUNK_SIDE = 1 << CHUNK_BITS
+CHUNK_MASK = CHUNK_SIDE - 1
+CHUNK_BYTES = CHUNK_SIDE * CHUNK_SIDE // 8
+
+
+class VisitedMap:
+    """Conjunto de posições visitadas guardado como mapas de bits de blocos de 32x32 células.
+
+    Oferece a mesma interface usada de um set de tuplas (add, in, len, iteração), mas ocupa
+    um bit por célula e não aloca nada nas consultas. Cada bloco de 128 bytes só é alocado na
+    primeira inserção dentro dele, então a memória acompanha a área que o agente de fato percorreu,
+    e não o tamanho do grid.
+    """
+
+    __slots__ = ("width", "height", "rows", "chunks", "count")
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.rows = (height + CHUNK_MASK) >> CHUNK_BITS
+        self.chunks = {}
+        self.count = 0
+
+    def add(self, pos):
+        x, y = pos
+        key = (x >> CHUNK_BITS) * self.rows + (y >> CHUNK_BITS)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = bytearray(CHUNK_BYTES)
+        index = ((x & CHUNK_MASK) << CHUNK_BITS) | (y & CHUNK_MASK)
+        mask = 1 << (index & 7)
+        byte = chunk[index >> 3]
+        if not byte & mask:
+            chunk[index >> 3] = byte | mask
+            self.count += 1
+
+    def __contains__(self, pos):
+        x, y = pos
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        chunk = self.chunks.get((x >> CHUNK_BITS) * self.rows + (y >> CHUNK_BITS))
+        if chunk is None:
+            return False
+        index = ((x & CHUNK_MASK) << CHUNK_BITS) | (y & CHUNK_MASK)
+        return bool(chunk[index >> 3] & (1 << (index & 7)))
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for key, chunk in self.chunks.items():
+            x0, y0 = (key // self.rows) << CHUNK_BITS, (key % self.rows) << CHUNK_BITS
+            for byte_index, byte in enumerate(chunk):
+                if not byte:
+                    continue
+                for bit in range(8):
+                    if byte & (1 << bit):
+                        index = (byte_index << 3) + bit
+                        yield x0 + (index >> CHUNK_BITS), y0 + (index & CHUNK_MASK)
+
+    def clear(self):
+        self.chunks = {}
+        self.count = 0
+
+    @property
+    def nbytes(self):
+        """Memória ocupada pelos blocos alocados e pelo dicionário que os guarda, em bytes."""
+        if not self.chunks:
+            return 0
+        return sys.getsizeof(self.chunks) + sum(sys.getsizeof(chunk) for chunk in self.chunks.values())
+
+
+class VisitedBlocks:
+    """Mapas de posições visitadas de vários agentes vetorizados, nos mesmos blocos de 32x32 células do VisitedMap.
+
+    Cada bloco é identificado pela chave dono * blocos_do_grid + bloco, em que o dono é o unique_id do
+    agente. As chaves ficam ordenadas em um array com o índice do bloco correspondente em chunks, então
+    as consultas de um passo inteiro são um searchsorted. Só os blocos tocados por algum agente são alocados.
+    """
+
+    def __init__(self, width, height):
+        self.rows = (height + CHUNK_MASK) >> CHUNK_BITS
+        self.num_chunks = ((width + CHUNK_MASK) >> CHUNK_BITS) * self.rows
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.slots = np.zeros(0, dtype=np.int64)
+        self.chunks = np.zeros((0, CHUNK_BYTES), dtype=np.uint8)
+        self.used = 0
+
+    def _locate(self, owners, x, y):
+        keys = owners * self.num_chunks + (x >> CHUNK_BITS) * self.rows + (y >> CHUNK_BITS)
+        index = ((x & CHUNK_MASK) << CHUNK_BITS) | (y & CHUNK_MASK)
+        return keys, index >> 3, (1 << (index & 7)).astype(np.uint8)
+
+    def _find(self, keys):
+        """Índice em chunks do bloco de cada chave, ou -1 se ele não foi alocado."""
+        if len(self.keys) == 0:
+            return np.full(keys.shape, -1, dtype=np.int64)
+        at = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        return np.where(self.keys[at] == keys, self.slots[at], -1)
+
+    def _insert(self, keys, chunks):
+        """Guarda blocos de chaves novas, já ordenadas."""
+        count = len(keys)
+        if self.used + count > len(self.chunks):
+            grown = np.zeros((max(2 * len(self.chunks), self.used + count, 64), CHUNK_BYTES), dtype=np.uint8)
+            grown[:self.used] = self.chunks[:self.used]
+            self.chunks = grown
+        slots = np.arange(self.used, self.used + count)
+        self.chunks[slots] = chunks
+        self.used += count
+        at = np.searchsorted(self.keys, keys)
+        self.keys = np.insert(self.keys, at, keys)
+        self.slots = np.insert(self.slots, at, slots)
+
+    def mark(self, owners, x, y):
+        """Marca a célula (x, y) como visitada por cada dono; cada dono aparece uma vez só."""
+        keys, byte, mask = self._locate(owners, x, y)
+        slots = self._find(keys)
+        missing = slots < 0
+        if missing.any():
+            new_keys = np.unique(keys[missing])
+            self._insert(new_keys, np.zeros((len(new_keys), CHUNK_BYTES), dtype=np.uint8))
+            slots[missing] = self._find(keys[missing])
+        self.chunks[slots, byte] |= mask
+
+    def contains(self, owners, x, y):
+        """Se cada dono já visitou a célula (x, y) correspondente; aceita arrays de mesmo formato."""
+        keys, byte, mask = self._locate(owners, x, y)
+        slots = self._find(keys)
+        return (slots >= 0) & ((self.chunks[np.maximum(slots, 0), byte] & mask) != 0)
+
+    def take(self, owners):
+        """Remove e retorna (chaves, blocos) dos donos indicados, para outro VisitedBlocks adotá-los com put."""
+        taken = np.isin(self.keys // self.num_chunks, owners)
+        keys, chunks = self.keys[taken], self.chunks[self.slots[taken]]
+        self.keys, self.slots = self.keys[~taken], self.slots[~taken]
+        if self.used > 2 * len(self.keys) + 64:
+            self.chunks = self.chunks[self.slots]
+            self.slots = np.arange(len(self.keys))
+            self.used = len(self.keys)
+        return keys, chunks
+
+    def put(self, keys, chunks):
+        """Adota os blocos retornados por take ou state."""
+        if len(keys):
+            self._insert(keys, chunks)
+
+    def state(self):
+        """(chaves, blocos) de todos os donos, em ordem de chave."""
+        return self.keys.copy(), self.chunks[self.slots]
+
+    def nbytes(self, owners):
+        """Bytes dos blocos alocados de cada dono."""
+        owner_of = self.keys // self.num_chunks
+        counts = np.searchsorted(owner_of, owners, side="right") - np.searchsorted(owner_of, owners)
+        return counts * CHUNK_BYTES
@@ -0,0 +1,49 @@
+// Grid do ModelBase desenhado por células: guarda os portrayals de cada célula e, a cada quadro,
+// redesenha só as células que o servidor (DeltaCanvasGrid) informou como alteradas.
+const DeltaCanvasModule = function (canvas_width, canvas_height, grid_width, grid_height) {
+  const parent = document.createElement("div");
+  parent.style.height = `${canvas_height}px`;
+  parent.className = "world-grid-parent";
+
+  const canvas = document.createElement("canvas");
+  canvas.width = canvas_width;
+  canvas.height = canvas_height;
+  canvas.className = "world-grid";
+  parent.appendChild(canvas);
+  document.getElementById("elements").appendChild(parent);
+
+  const context = canvas.getContext("2d");
+  const canvasDraw = new GridVisualization(canvas_width, canvas_height, grid_width, grid_height, context, null);
+  const cellWidth = Math.floor(canvas_width / grid_width);
+  const cellHeight = Math.floor(canvas_height / grid_height);
+  let cells = new Map();
+
+  const drawCell = (x, y) => {
+    const left = x * cellWidth;
+    const top = (grid_height - y - 1) * cellHeight;
+    context.clearRect(left, top, cellWidth, cellHeight);
+    // drawLayer altera os objetos recebidos (inverte y), então desenha cópias
+    const portrayals = (cells.get(`${x},${y}`) || [])
+      .map((p) => Object.assign({}, p, { x, y }))
+      .sort((a, b) => a.Layer - b.Layer);
+    canvasDraw.drawLayer(portrayals);
+    context.strokeStyle = "#eee";
+    context.strokeRect(left + 0.5, top + 0.5, cellWidth, cellHeight);
+  };
+
+  this.render = (data) => {
+    if (!data) return;
+    if (data.full) this.reset();
+    for (const [x, y, portrayals] of data.cells) {
+      if (portrayals.length) cells.set(`${x},${y}`, portrayals);
+      else cells.delete(`${x},${y}`);
+      drawCell(x, y);
+    }
+    if (data.full) canvasDraw.drawGridLines();
+  };
+
+  this.reset = () => {
+    cells = new Map();
+    canvasDraw.resetCanvas();
+  };
+};